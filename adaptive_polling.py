@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+import config_loader
+from term import DayTerms
+
+__DATABASE_FILE_NAME = "polling_statistics.db"
+__SCHEMA = """
+    CREATE TABLE IF NOT EXISTS polls (
+        city_id INTEGER NOT NULL,
+        service_id INTEGER NOT NULL,
+        hour_of_week INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (city_id, service_id, hour_of_week)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS appearances (
+        city_id INTEGER NOT NULL,
+        service_id INTEGER NOT NULL,
+        clinic_id INTEGER NOT NULL,
+        hour_of_week INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (city_id, service_id, clinic_id, hour_of_week)
+    ) WITHOUT ROWID;
+"""
+_PRIOR_APPEARANCES = 1.0
+_PRIOR_POLLS = 4.0
+_MIN_INTERVAL_SECONDS = 60
+_MAX_INTERVAL_MULTIPLIER = 4
+_HOURS_PER_WEEK = 7 * 24
+
+
+def connect() -> sqlite3.Connection:
+    connection = sqlite3.connect(config_loader.get_configuration_directory_path() + __DATABASE_FILE_NAME, timeout=30,
+                                 check_same_thread=False)
+    connection.executescript(__SCHEMA)
+    return connection
+
+
+class AdaptivePollingPolicy:
+
+    def __init__(self, connection: sqlite3.Connection, monitors: [{}], requests_per_hour: float):
+        self._connection = connection
+        self._monitors = monitors
+        self._requests_per_hour = requests_per_hour
+        self._previous_slots = {}
+        self._lock = threading.Lock()
+
+    def record_poll(self, monitor: {}, terms: [DayTerms]):
+        with self._lock:
+            self._record_poll(monitor, terms)
+
+    def get_interval(self, monitor: {}) -> float:
+        with self._lock:
+            return self._get_interval(monitor)
+
+    def _record_poll(self, monitor: {}, terms: [DayTerms]):
+        hour_of_week = _get_hour_of_week(datetime.now())
+        current_slots = {(day_terms.date, visit.key) for day_terms in terms for visit in day_terms.visits}
+        previous_slots = self._previous_slots.get(id(monitor))
+        self._previous_slots[id(monitor)] = current_slots
+
+        if previous_slots is None:
+            return
+
+        new_slots_per_clinic = {}
+        for _, (_, _, clinic_id) in current_slots - previous_slots:
+            new_slots_per_clinic[clinic_id] = new_slots_per_clinic.get(clinic_id, 0) + 1
+
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO polls (city_id, service_id, hour_of_week, count) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (city_id, service_id, hour_of_week) DO UPDATE SET count = count + 1",
+                (monitor["city_id"], monitor["service_id"], hour_of_week))
+            self._connection.executemany(
+                "INSERT INTO appearances (city_id, service_id, clinic_id, hour_of_week, count) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (city_id, service_id, clinic_id, hour_of_week) "
+                "DO UPDATE SET count = count + excluded.count",
+                [(monitor["city_id"], monitor["service_id"], clinic_id, hour_of_week, count)
+                 for clinic_id, count in new_slots_per_clinic.items()])
+
+    def _get_interval(self, monitor: {}) -> float:
+        hour_of_week = _get_hour_of_week(datetime.now())
+        active_monitors = [active_monitor for active_monitor in self._monitors
+                           if active_monitor["to_date"] >= datetime.now().date()] or [monitor]
+        intervals = {id(active_monitor): self._get_preferred_interval(active_monitor, hour_of_week)
+                     for active_monitor in active_monitors}
+
+        polls_per_hour = sum(3600 / interval for interval in intervals.values())
+        scale = max(1.0, polls_per_hour / self._requests_per_hour)
+        interval = intervals.get(id(monitor)) or self._get_preferred_interval(monitor, hour_of_week)
+        return interval * scale
+
+    def _get_preferred_interval(self, monitor: {}, hour_of_week: int) -> float:
+        hourly_yields = self._get_hourly_yields(monitor)
+        relative_yield = hourly_yields[hour_of_week] * len(hourly_yields) / sum(hourly_yields)
+        interval = monitor["interval"] / relative_yield
+        return min(max(interval, monitor["interval"] / _MAX_INTERVAL_MULTIPLIER, _MIN_INTERVAL_SECONDS),
+                   monitor["interval"] * _MAX_INTERVAL_MULTIPLIER)
+
+    def _get_hourly_yields(self, monitor: {}) -> [float]:
+        polls = dict(self._connection.execute(
+            "SELECT hour_of_week, SUM(count) FROM polls WHERE city_id = ? AND service_id = ? GROUP BY hour_of_week",
+            (monitor["city_id"], monitor["service_id"])))
+
+        query = "SELECT hour_of_week, SUM(count) FROM appearances WHERE city_id = ? AND service_id = ?"
+        parameters = [monitor["city_id"], monitor["service_id"]]
+        if monitor["clinic_id"]:
+            query += " AND clinic_id = ?"
+            parameters.append(monitor["clinic_id"])
+        appearances = dict(self._connection.execute(query + " GROUP BY hour_of_week", parameters))
+
+        return [(appearances.get(hour_of_week, 0) + _PRIOR_APPEARANCES) / (polls.get(hour_of_week, 0) + _PRIOR_POLLS)
+                for hour_of_week in range(_HOURS_PER_WEEK)]
+
+
+def _get_hour_of_week(moment: datetime) -> int:
+    return moment.weekday() * 24 + moment.hour
@@ -0,0 +1,52 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+
+from requests import RequestException
+
+import luxmed_api
+import notifier
+import query_planner
+import report_service
+from config_loader import ConfigurationValidationException
+from luxmed_api import LuxmedApiException
+from notifier import NotifierException, Sink
+
+
+def run(monitors: [{}], workers: int, requests_per_second: float = None, sinks: [Sink] = None):
+    luxmed_api.configure_connections(workers, requests_per_second)
+    active_monitors = [monitor for monitor in monitors if monitor["to_date"] >= date.today()]
+    queries = query_planner.plan_queries(active_monitors)
+
+    accounts_count = len({monitor["account"] for monitor in active_monitors})
+
+    print(f"Checking {len(active_monitors)} monitor(s) of {accounts_count} account(s) with {len(queries)} request(s) "
+          f"using {workers} worker(s)...")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor, notifier.background_dispatch(sinks):
+        futures = {executor.submit(query_planner.execute_query, query): query for query in queries}
+
+        for future in as_completed(futures):
+            __report_query_results(futures[future], future)
+
+
+def __report_query_results(query: {}, future):
+    try:
+        results = future.result()
+    except (LuxmedApiException, RequestException, ConfigurationValidationException) as exception:
+        for monitor in query["monitors"]:
+            print(f"[{monitor['name']}] Unable to get terms from the Luxmed API. Details: {exception}")
+        return
+
+    for monitor, available_terms in results:
+        __report(monitor, available_terms)
+
+
+def __report(monitor: {}, available_terms: [{}]):
+    print(f"[{monitor['name']}] Terms have been retrieved")
+    try:
+        report_service.make_report(available_terms, monitor["email"], monitor["key"])
+    except NotifierException as exception:
+        print(f"[{monitor['name']}] {exception}")
+    except sqlite3.Error as exception:
+        print(f"[{monitor['name']}] Unable to check which visits are new. Details: {exception}")
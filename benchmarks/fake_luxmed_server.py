@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks import payloads
+
+TOKEN_PATH = "/PatientPortalMobileAPI/api/token"
+LOG_IN_PATH = "/PatientPortal/Account/LogInToApp"
+CITIES_PATH = "/PatientPortal/NewPortal/Dictionary/cities"
+SERVICES_PATH = "/PatientPortal/NewPortal/Dictionary/serviceVariantsGroups"
+FACILITIES_AND_DOCTORS_PATH = "/PatientPortal/NewPortal/Dictionary/facilitiesAndDoctors"
+TERMS_PATH = "/PatientPortal/NewPortal/terms/index"
+
+
+class FakeLuxmedServer:
+
+    def __init__(self, latency: float = 0.0, terms_per_day: int = 40, seed: int = 0):
+        self.latency = latency
+        self.terms_per_day = terms_per_day
+        self.seed = seed
+        self.request_counts = {}
+        self.response_bytes = 0
+        self._counts_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _create_request_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-luxmed-server", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLuxmedServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counters(self):
+        with self._counts_lock:
+            self.request_counts = {}
+            self.response_bytes = 0
+
+    def get_total_requests(self) -> int:
+        with self._counts_lock:
+            return sum(self.request_counts.values())
+
+    def record_request(self, path: str, response_size: int):
+        with self._counts_lock:
+            self.request_counts[path] = self.request_counts.get(path, 0) + 1
+            self.response_bytes += response_size
+
+    def generate_terms(self, from_date: date, to_date: date) -> {}:
+        days = (to_date - from_date).days + 1
+        terms_for_days = payloads.generate_terms_for_days(days, self.terms_per_day, first_day=from_date, seed=self.seed)
+        return {"termsForService": {"termsForDays": terms_for_days}}
+
+
+def _create_request_handler(server: FakeLuxmedServer):
+    class FakeLuxmedRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, message_format, *args):
+            pass
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            if path == TOKEN_PATH:
+                self._send_json(path, {"access_token": "fake-access-token", "expires_in": 3600})
+            else:
+                self._send_json(path, {"message": "Not found"}, 404)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parameters = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+            if url.path == LOG_IN_PATH:
+                self._send_json(url.path, {}, headers={"Set-Cookie": "ASP.NET_SessionId=fake-session; Path=/"})
+            elif "ASP.NET_SessionId=fake-session" not in self.headers.get("Cookie", ""):
+                self._send_json(url.path, {"message": "Unauthorized"}, 401)
+            elif url.path == CITIES_PATH:
+                self._send_json(url.path, [{"id": 1, "name": "Warszawa"}, {"id": 2, "name": "Kraków"}])
+            elif url.path == SERVICES_PATH:
+                self._send_json(url.path, payloads.generate_service_variants_groups())
+            elif url.path == FACILITIES_AND_DOCTORS_PATH:
+                self._send_json(url.path, payloads.generate_facilities_and_doctors())
+            elif url.path == TERMS_PATH:
+                from_date = date.fromisoformat(parameters["searchDateFrom"])
+                to_date = date.fromisoformat(parameters["searchDateTo"])
+                self._send_json(url.path, server.generate_terms(from_date, to_date))
+            else:
+                self._send_json(url.path, {"message": "Not found"}, 404)
+
+        def _send_json(self, path: str, payload, status_code: int = 200, headers: {} = None):
+            time.sleep(server.latency)
+            body = json.dumps(payload).encode("utf-8")
+
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            server.record_request(path, len(body))
+
+    return FakeLuxmedRequestHandler
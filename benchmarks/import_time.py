@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+__REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+__REPEATS = 10
+__DEFERRED_MODULES = ["requests", "tabulate", "smtplib", "email.mime.text", "sqlite3", "luxmed_api", "booking_service",
+                      "report_service", "email_sender", "notifier"]
+
+
+def main() -> int:
+    eagerly_imported_modules = __get_eagerly_imported_modules()
+    results = {
+        "benchmark": "import_time",
+        "import_yalma_microseconds": min(__measure_import_time() for _ in range(__REPEATS)),
+        "help_command_seconds": round(min(__measure_help_command() for _ in range(__REPEATS)), 6),
+        "eagerly_imported_modules": eagerly_imported_modules
+    }
+    print(json.dumps(results, indent=2))
+
+    if eagerly_imported_modules:
+        print(f"Modules which should be imported only by commands: {', '.join(eagerly_imported_modules)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+def __measure_import_time() -> int:
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", "import yalma"], cwd=__REPOSITORY_PATH,
+                             capture_output=True, text=True, check=True)
+    for line in process.stderr.splitlines():
+        _, _, cumulative_time, module_name = [part.strip() for part in line.replace(":", "|", 1).split("|")]
+        if module_name == "yalma":
+            return int(cumulative_time)
+    raise RuntimeError("Unable to find the import time of the yalma module")
+
+
+def __measure_help_command() -> float:
+    started_at = time.perf_counter()
+    subprocess.run([sys.executable, "yalma.py", "--help"], cwd=__REPOSITORY_PATH, capture_output=True, check=True)
+    return time.perf_counter() - started_at
+
+
+def __get_eagerly_imported_modules() -> [str]:
+    script = f"import json, sys, yalma; print(json.dumps([m for m in {__DEFERRED_MODULES!r} if m in sys.modules]))"
+    process = subprocess.run([sys.executable, "-c", script], cwd=__REPOSITORY_PATH, capture_output=True, text=True,
+                             check=True)
+    return json.loads(process.stdout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+import contextlib
+import sys
+
+import notifier
+import yalma
+
+__sent_notifications = []
+
+
+def main(arguments: [str]):
+    notifier.notify = lambda notification, on_delivered=None: __sent_notifications.append(notification)
+    notifier.background_dispatch = contextlib.nullcontext
+    yalma.main(["monitor", "--notify-all", *arguments], standalone_mode=False)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
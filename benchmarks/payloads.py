@@ -0,0 +1,70 @@
+import random
+from datetime import date, timedelta
+
+__FIRST_NAMES = ["Anna", "Jan", "Katarzyna", "Piotr", "Małgorzata", "Tomasz", "Agnieszka", "Paweł"]
+__LAST_NAMES = ["Nowak", "Kowalski", "Wiśniewska", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowska", "Zieliński"]
+__ACADEMIC_TITLES = ["lek.", "dr n. med.", "lek. dent.", None]
+
+
+def generate_terms_for_days(days: int, terms_per_day: int, doctors: int = 20, clinics: int = 8,
+                            first_day: date = None, seed: int = 0) -> [{}]:
+    generator = random.Random(seed)
+    first_day = first_day or date.today()
+    doctor_definitions = [__generate_doctor(generator, doctor_id) for doctor_id in range(1, doctors + 1)]
+    clinic_definitions = [(clinic_id, f"LX Warszawa - Placówka {clinic_id}") for clinic_id in range(1, clinics + 1)]
+
+    terms_for_days = []
+    for day_offset in range(days):
+        day = first_day + timedelta(days=day_offset)
+        minutes = sorted(generator.sample(range(7 * 60, 21 * 60, 5), min(terms_per_day, 168)))
+        terms = [__generate_term(generator, day, minute, doctor_definitions, clinic_definitions)
+                 for minute in minutes]
+        terms_for_days.append({"day": f"{day.isoformat()}T00:00:00", "terms": terms})
+
+    return terms_for_days
+
+
+def __generate_doctor(generator: random.Random, doctor_id: int) -> {}:
+    return {
+        "id": doctor_id,
+        "academicTitle": generator.choice(__ACADEMIC_TITLES),
+        "firstName": generator.choice(__FIRST_NAMES),
+        "lastName": generator.choice(__LAST_NAMES)
+    }
+
+
+def __generate_term(generator: random.Random, day: date, minute: int, doctors: [{}], clinics: [tuple]) -> {}:
+    clinic_id, clinic_name = generator.choice(clinics)
+    hour = minute // 60
+    return {
+        "dateTimeFrom": f"{day.isoformat()}T{hour:02d}:{minute % 60:02d}:00",
+        "doctor": generator.choice(doctors),
+        "clinicId": clinic_id,
+        "clinic": clinic_name,
+        "partOfDay": 1 if hour < 12 else 2 if hour < 17 else 3
+    }
+
+
+def generate_service_variants_groups(categories: int = 10, services_per_category: int = 30, seed: int = 0) -> [{}]:
+    generator = random.Random(seed)
+    groups = []
+    for category_id in range(1, categories + 1):
+        services = []
+        for service_index in range(services_per_category):
+            service_id = category_id * 1000 + service_index
+            variants = [{"id": service_id * 10 + variant, "name": f"Konsultacja {service_id}/{variant}",
+                         "children": []} for variant in range(generator.randint(0, 3))]
+            services.append({"id": service_id, "name": f"Usługa {service_id}", "children": variants})
+        groups.append({"id": category_id, "name": f"Kategoria {category_id}", "children": services})
+    return groups
+
+
+def generate_facilities_and_doctors(doctors: int = 20, clinics: int = 8, seed: int = 0) -> {}:
+    generator = random.Random(seed)
+    return {
+        "facilities": [{"id": clinic_id, "name": f"LX Warszawa - Placówka {clinic_id}"}
+                       for clinic_id in range(1, clinics + 1)],
+        "doctors": [dict(__generate_doctor(generator, doctor_id),
+                         facilityGroupIds=generator.sample(range(1, clinics + 1), 2))
+                    for doctor_id in range(1, doctors + 1)]
+    }
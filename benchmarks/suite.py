@@ -0,0 +1,151 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks import payloads
+from benchmarks.fake_luxmed_server import FakeLuxmedServer
+
+__REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+__FIRST_DAY = date(2030, 1, 1)
+__PAYLOAD_SIZES = [(7, 20), (30, 60), (90, 120)]
+__CONFIGURATION_TEMPLATE = """[luxmed]
+username = benchmark
+password = benchmark
+language = pl
+base_url = {base_url}
+requests_per_second = 1000
+
+[email_settings]
+username = benchmark@localhost
+password = benchmark
+smtp_server = localhost
+smtp_port = 465
+"""
+
+
+def main():
+    arguments = __parse_arguments()
+    server = FakeLuxmedServer(latency=arguments.latency).start()
+
+    try:
+        with tempfile.TemporaryDirectory() as home_path:
+            configuration_path = Path(home_path, ".config", "yalma")
+            configuration_path.mkdir(parents=True)
+            configuration_path.joinpath("config.ini").write_text(__CONFIGURATION_TEMPLATE.format(base_url=server.url),
+                                                                 encoding="utf-8")
+            results = {
+                "python": platform.python_version(),
+                "latency_seconds": arguments.latency,
+                "repeats": arguments.repeats,
+                "monitor": __measure_monitor(server, home_path, arguments.repeats),
+                "pipeline": __measure_pipelines(home_path, arguments.repeats)
+            }
+    finally:
+        server.stop()
+
+    output = json.dumps(results, indent=2)
+    if arguments.output:
+        Path(arguments.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+def __parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure hot paths of Yalma against a local fake Luxmed server")
+    parser.add_argument("--latency", type=float, default=0.05, help="latency of every fake server response in seconds")
+    parser.add_argument("--repeats", type=int, default=5, help="number of repetitions of every measurement")
+    parser.add_argument("--output", help="write the results as JSON to the given file")
+    return parser.parse_args()
+
+
+def __measure_monitor(server: FakeLuxmedServer, home_path: str, repeats: int) -> {}:
+    session_file_path = Path(home_path, ".config", "yalma", "session.json")
+    cold_checks = [__run_monitor_check(server, home_path, session_file_path) for _ in range(repeats)]
+    warm_checks = [__run_monitor_check(server, home_path) for _ in range(repeats)]
+
+    return {"cold_session": __summarize_checks(cold_checks), "cached_session": __summarize_checks(warm_checks)}
+
+
+def __run_monitor_check(server: FakeLuxmedServer, home_path: str, session_file_path: Path = None) -> {}:
+    if session_file_path is not None and session_file_path.exists():
+        session_file_path.unlink()
+    server.reset_counters()
+
+    arguments = ["--email", "benchmark@localhost", "--city-id", "1", "--service-id", "1",
+                 "--from-date", __FIRST_DAY.isoformat(), "--to-date", (__FIRST_DAY + timedelta(days=30)).isoformat()]
+    started_at = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "benchmarks.monitor_check", *arguments], cwd=__REPOSITORY_PATH,
+                   env=dict(os.environ, HOME=home_path), capture_output=True, check=True)
+    elapsed_time = time.perf_counter() - started_at
+
+    return {"seconds": elapsed_time, "requests": server.get_total_requests(), "response_bytes": server.response_bytes}
+
+
+def __summarize_checks(checks: [{}]) -> {}:
+    durations = [check["seconds"] for check in checks]
+    return {
+        "median_seconds": round(statistics.median(durations), 6),
+        "min_seconds": round(min(durations), 6),
+        "max_seconds": round(max(durations), 6),
+        "requests_per_check": statistics.median(check["requests"] for check in checks),
+        "response_bytes_per_check": statistics.median(check["response_bytes"] for check in checks)
+    }
+
+
+def __measure_pipelines(home_path: str, repeats: int) -> [{}]:
+    import notifier
+
+    original_home_path, original_notify = os.environ.get("HOME"), notifier.notify
+    os.environ["HOME"] = home_path
+    notifier.notify = lambda notification, on_delivered=None: None
+    try:
+        return [__measure_pipeline(days, terms_per_day, repeats) for days, terms_per_day in __PAYLOAD_SIZES]
+    finally:
+        notifier.notify = original_notify
+        if original_home_path is None:
+            del os.environ["HOME"]
+        else:
+            os.environ["HOME"] = original_home_path
+
+
+def __measure_pipeline(days: int, terms_per_day: int, repeats: int) -> {}:
+    import booking_service
+    import report_service
+
+    raw_terms = payloads.generate_terms_for_days(days, terms_per_day, first_day=__FIRST_DAY)
+    to_date = __FIRST_DAY + timedelta(days=days - 1)
+
+    parse_durations, report_durations = [], []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        available_terms = list(booking_service.filter_available_terms(raw_terms, __FIRST_DAY, to_date, 0))
+        parsed_at = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            report_service.make_report(available_terms, "benchmark@localhost")
+        reported_at = time.perf_counter()
+
+        parse_durations.append(parsed_at - started_at)
+        report_durations.append(reported_at - parsed_at)
+
+    terms = days * terms_per_day
+    parse_seconds, report_seconds = min(parse_durations), min(report_durations)
+    return {
+        "days": days,
+        "terms": terms,
+        "parse_filter_seconds": round(parse_seconds, 6),
+        "report_seconds": round(report_seconds, 6),
+        "terms_per_second": round(terms / (parse_seconds + report_seconds))
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import json
+import timeit
+from datetime import datetime
+
+import utils
+from benchmarks import payloads
+
+__DAYS = 90
+__TERMS_PER_DAY = 60
+__REPEATS = 5
+
+
+def main():
+    terms_for_days = payloads.generate_terms_for_days(__DAYS, __TERMS_PER_DAY)
+    strptime_seconds = __measure(terms_for_days, __parse_with_strptime)
+    utils_seconds = __measure(terms_for_days, __parse_with_utils)
+
+    print(json.dumps({
+        "benchmark": "timestamp_parsing",
+        "days": __DAYS,
+        "terms": __DAYS * __TERMS_PER_DAY,
+        "strptime_seconds": round(strptime_seconds, 6),
+        "utils_seconds": round(utils_seconds, 6),
+        "speedup": round(strptime_seconds / utils_seconds, 2)
+    }, indent=2))
+
+
+def __measure(terms_for_days: [{}], parse) -> float:
+    return min(timeit.repeat(lambda: parse(terms_for_days), setup=__clear_caches, number=1, repeat=__REPEATS))
+
+
+def __clear_caches():
+    utils.convert_string_to_date.cache_clear()
+    utils.__convert_string_to_time_of_day.cache_clear()
+    utils.__convert_string_to_calendar_date.cache_clear()
+
+
+def __parse_with_strptime(terms_for_days: [{}]):
+    for terms_in_day in terms_for_days:
+        datetime.strptime(terms_in_day["day"], "%Y-%m-%dT%H:%M:%S").date()
+        for term in terms_in_day["terms"]:
+            datetime.strptime(term["dateTimeFrom"], "%Y-%m-%dT%H:%M:%S").time()
+
+
+def __parse_with_utils(terms_for_days: [{}]):
+    for terms_in_day in terms_for_days:
+        utils.convert_string_to_date(terms_in_day["day"])
+        for term in terms_in_day["terms"]:
+            utils.convert_string_to_time(term["dateTimeFrom"])
+
+
+if __name__ == "__main__":
+    main()
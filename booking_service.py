@@ -1,22 +1,29 @@
-from datetime import datetime
-from typing import Callable, Any, Union
+import sqlite3
+import time
+from datetime import datetime, date
+from typing import Callable, Iterator
 
 import luxmed_api
+import metrics
+import slot_history
+import term
+import terms_fetcher
 import utils
 from luxmed_api import Language
+from term import Term, DayTerms
 
 
-def get_cities():
-    return luxmed_api.get_cities()
+def get_cities(refresh: bool = False):
+    return luxmed_api.get_cities(refresh)
 
 
-def get_clinics(city_id: int, service_id: int) -> [{}]:
-    result = luxmed_api.get_clinics_and_doctors(city_id, service_id)
+def get_clinics(city_id: int, service_id: int, refresh: bool = False) -> [{}]:
+    result = luxmed_api.get_clinics_and_doctors(city_id, service_id, refresh)
     return sorted([__convert_clinic(clinic) for clinic in result["facilities"]], key=lambda clinic: clinic["name"])
 
 
-def get_services() -> [{}]:
-    result = luxmed_api.get_services()
+def get_services(refresh: bool = False) -> [{}]:
+    result = luxmed_api.get_services(refresh)
     services = []
     for category in result:
         for service in category["children"]:
@@ -28,8 +35,8 @@ def get_services() -> [{}]:
     return sorted(services, key=lambda i: i["name"])
 
 
-def get_doctors(city_id: int, service_id: int, clinic_id: int = None) -> [{}]:
-    result = luxmed_api.get_clinics_and_doctors(city_id, service_id)
+def get_doctors(city_id: int, service_id: int, clinic_id: int = None, refresh: bool = False) -> [{}]:
+    result = luxmed_api.get_clinics_and_doctors(city_id, service_id, refresh)
     sorted_result = sorted(result["doctors"], key=lambda i: i["firstName"])
 
     doctors = []
@@ -41,11 +48,76 @@ def get_doctors(city_id: int, service_id: int, clinic_id: int = None) -> [{}]:
 
 
 def get_available_terms(city_id: int, service_id: int, from_date: datetime, to_date: datetime, part_of_day: int,
-                        language: Language, clinic_id: int = None, doctor_id: int = None) -> [{}]:
-    result = luxmed_api.get_terms(city_id, service_id, from_date, to_date, language, clinic_id, doctor_id)
-    available_terms = [__parse_terms_for_day(terms_per_day) for terms_per_day in result]
-    filtered_terms_by_dates = __filter_terms_by_dates(available_terms, from_date, to_date)
-    return __filter_terms_by_criteria(filtered_terms_by_dates, part_of_day, clinic_id, doctor_id)
+                        language: Language, clinic_id: int = None, doctor_id: int = None,
+                        account: str = None) -> [DayTerms]:
+    return list(iterate_available_terms(city_id, service_id, from_date, to_date, part_of_day, language, clinic_id,
+                                        doctor_id, account))
+
+
+def iterate_available_terms(city_id: int, service_id: int, from_date: datetime, to_date: datetime, part_of_day: int,
+                            language: Language, clinic_id: int = None, doctor_id: int = None,
+                            account: str = None) -> Iterator[DayTerms]:
+    result = terms_fetcher.fetch_terms(city_id, service_id, from_date, to_date, language, clinic_id, doctor_id,
+                                       account)
+    return __record_history(service_id, filter_available_terms(result, from_date, to_date, part_of_day, clinic_id,
+                                                               doctor_id))
+
+
+def get_raw_terms(city_id: int, service_id: int, from_date: datetime, to_date: datetime, language: Language,
+                  account: str = None) -> [{}]:
+    return list(terms_fetcher.fetch_terms(city_id, service_id, from_date, to_date, language, account=account))
+
+
+def filter_available_terms(raw_terms: [{}], from_date: datetime, to_date: datetime, part_of_day: int,
+                           clinic_id: int = None, doctor_id: int = None) -> Iterator[DayTerms]:
+    is_matching_term = __create_term_predicate(part_of_day, clinic_id, doctor_id)
+    parsing_time, parsed_terms_count, matched_terms_count = 0.0, 0, 0
+
+    try:
+        for term_date, raw_terms_in_day in __filter_days_by_dates(raw_terms, from_date, to_date):
+            started_at = time.perf_counter()
+            visits = [__parse_term_for_day(raw_term) for raw_term in raw_terms_in_day["terms"]
+                      if is_matching_term(raw_term)]
+            parsing_time += time.perf_counter() - started_at
+            parsed_terms_count += len(raw_terms_in_day["terms"])
+            matched_terms_count += len(visits)
+
+            if visits:
+                yield DayTerms(term_date, visits)
+    finally:
+        metrics.observe("yalma_phase_duration_seconds", parsing_time, phase="parsing")
+        metrics.increment("yalma_slots_parsed_total", parsed_terms_count)
+        metrics.increment("yalma_slots_matched_total", matched_terms_count)
+
+
+def get_available_terms_for_monitor(monitor: {}) -> [DayTerms]:
+    return get_available_terms(monitor["city_id"], monitor["service_id"], get_monitor_from_date(monitor),
+                               monitor["to_date"], monitor["time_of_day"], monitor["language"], monitor["clinic_id"],
+                               monitor["doctor_id"], monitor["account"])
+
+
+def filter_available_terms_for_monitor(raw_terms: [{}], monitor: {}) -> Iterator[DayTerms]:
+    available_terms = filter_available_terms(raw_terms, get_monitor_from_date(monitor), monitor["to_date"],
+                                             monitor["time_of_day"], monitor["clinic_id"], monitor["doctor_id"])
+    return __record_history(monitor["service_id"], available_terms)
+
+
+def get_monitor_from_date(monitor: {}) -> date:
+    return max(monitor["from_date"] or date.today(), date.today())
+
+
+def __record_history(service_id: int, terms: Iterator[DayTerms]) -> Iterator[DayTerms]:
+    observed_terms = []
+    for day_terms in terms:
+        observed_terms.append(day_terms)
+        yield day_terms
+
+    if slot_history.is_enabled():
+        try:
+            with metrics.timed("history"):
+                slot_history.record(service_id, observed_terms)
+        except sqlite3.Error as exception:
+            print(f"Unable to record the history of visits. Details: {exception}")
 
 
 def __convert_clinic(clinic: {}) -> {}:
@@ -62,27 +134,12 @@ def __convert_doctor(doctor: {}) -> {}:
     }
 
 
-def __parse_terms_for_day(terms_in_current_day: {}) -> {}:
-    term_date = utils.convert_string_to_date(terms_in_current_day["day"])
-    current_day_terms = [__parse_term_for_day(current_term) for current_term in terms_in_current_day["terms"]]
-    return {
-        "date": term_date,
-        "visits": current_day_terms
-    }
-
-
-def __parse_term_for_day(current_term: {}) -> {}:
+def __parse_term_for_day(current_term: {}) -> Term:
     term_time = utils.convert_string_to_time(current_term["dateTimeFrom"])
     doctor_details = current_term["doctor"]
-    doctor_name = __parse_doctor_name(doctor_details)
-    return {
-        "time": term_time,
-        "doctor_id": doctor_details["id"],
-        "doctor_name": doctor_name,
-        "clinic_id": current_term["clinicId"],
-        "clinic_name": current_term["clinic"],
-        "part_of_day": current_term["partOfDay"]
-    }
+    doctor = term.get_doctor(doctor_details["id"], __parse_doctor_name(doctor_details))
+    clinic = term.get_clinic(current_term["clinicId"], current_term["clinic"])
+    return Term(term_time, doctor, clinic, current_term["partOfDay"])
 
 
 def __parse_doctor_name(doctor_details: {}) -> str:
@@ -91,27 +148,17 @@ def __parse_doctor_name(doctor_details: {}) -> str:
     )
 
 
-def __filter_terms_by_dates(terms: [{}], from_date: datetime, to_date: datetime) -> [{}]:
-    return list(filter(lambda term: from_date <= term["date"] <= to_date, terms))
-
-
-def __filter_terms_by_criteria(terms: [], part_of_day: int, clinic_id: int = None, doctor_id: int = None) -> []:
-    terms_filters = __get_term_filters_definitions(clinic_id, doctor_id, part_of_day)
+def __filter_days_by_dates(raw_terms: [{}], from_date: datetime, to_date: datetime) -> Iterator[tuple]:
+    for raw_terms_in_day in raw_terms:
+        term_date = utils.convert_string_to_date(raw_terms_in_day["day"])
+        if from_date <= term_date <= to_date:
+            yield term_date, raw_terms_in_day
 
-    filtered_terms = []
-    for term in terms:
-        filtered_terms_for_day = list(
-            filter(lambda given_term: all([term_filter(given_term) for term_filter in terms_filters]), term["visits"])
-        )
-        if filtered_terms_for_day:
-            filtered_terms.append({"date": term["date"], "visits": filtered_terms_for_day})
-    return filtered_terms
 
+def __create_term_predicate(part_of_day: int, clinic_id: int = None, doctor_id: int = None) -> Callable[[{}], bool]:
+    def is_matching_term(raw_term: {}) -> bool:
+        return (part_of_day == 0 or raw_term["partOfDay"] == part_of_day) \
+               and (not clinic_id or raw_term["clinicId"] == clinic_id) \
+               and (not doctor_id or raw_term["doctor"]["id"] == doctor_id)
 
-def __get_term_filters_definitions(clinic_id: int, doctor_id: int, part_of_day: int) -> [Callable[[Any],
-                                                                                                  Union[bool, Any]]]:
-    return [
-        lambda term: term["part_of_day"] == part_of_day if part_of_day != 0 else term,
-        lambda term: term["clinic_id"] == clinic_id if clinic_id else term,
-        lambda term: term["doctor_id"] == doctor_id if doctor_id else term
-    ]
+    return is_matching_term
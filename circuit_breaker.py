@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreakerOpenException(Exception):
+    pass
+
+
+class CircuitBreaker:
+
+    def __init__(self, state_file_path: str, failure_threshold: int, recovery_timeout: float):
+        self._state_file_path = state_file_path
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._state = {"state": CLOSED, "failures": 0, "opened_at": 0.0}
+        self._state_file_modified_at = None
+        self._probe_in_progress = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        with self._lock:
+            self._reload_state()
+
+            if self._state["state"] == OPEN:
+                remaining_time = self._state["opened_at"] + self._recovery_timeout - time.time()
+                if remaining_time > 0:
+                    raise CircuitBreakerOpenException(
+                        f"Luxmed API calls are suspended after repeated failures, the next attempt will be possible "
+                        f"in {int(remaining_time) + 1} seconds")
+                self._change_state(HALF_OPEN, self._state["failures"])
+
+            if self._state["state"] == HALF_OPEN:
+                if self._probe_in_progress:
+                    raise CircuitBreakerOpenException("Luxmed API calls are suspended until a trial request succeeds")
+                self._probe_in_progress = True
+
+    def record_success(self):
+        with self._lock:
+            self._probe_in_progress = False
+            if self._state["state"] != CLOSED or self._state["failures"]:
+                self._change_state(CLOSED, 0)
+
+    def record_failure(self):
+        with self._lock:
+            self._probe_in_progress = False
+            failures = self._state["failures"] + 1
+
+            if self._state["state"] == HALF_OPEN or failures >= self._failure_threshold:
+                self._change_state(OPEN, failures)
+            else:
+                self._change_state(self._state["state"], failures)
+
+    def record_retry(self):
+        with self._lock:
+            if self._probe_in_progress:
+                self._probe_in_progress = False
+                self._change_state(OPEN, self._state["failures"] + 1)
+
+    def get_state(self) -> str:
+        with self._lock:
+            self._reload_state()
+            return self._state["state"]
+
+    def _change_state(self, state: str, failures: int):
+        opened_at = time.time() if state == OPEN else self._state["opened_at"]
+        self._state = {"state": state, "failures": failures, "opened_at": opened_at}
+        self._save_state()
+
+    def _reload_state(self):
+        try:
+            modified_at = os.stat(self._state_file_path).st_mtime_ns
+            if modified_at == self._state_file_modified_at:
+                return
+            with open(self._state_file_path, "r", encoding="utf-8") as state_file:
+                self._state = json.load(state_file)
+            self._state_file_modified_at = modified_at
+        except (OSError, ValueError):
+            return
+
+    def _save_state(self):
+        temporary_state_file_path = f"{self._state_file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary_state_file_path, "w", encoding="utf-8") as state_file:
+                json.dump(self._state, state_file)
+            os.replace(temporary_state_file_path, self._state_file_path)
+            self._state_file_modified_at = os.stat(self._state_file_path).st_mtime_ns
+        except OSError as exception:
+            print(f"Unable to store the state of the circuit breaker. Details: {exception}")
@@ -1,9 +1,14 @@
 import codecs
 import platform
+import threading
 from configparser import ConfigParser
 from pathlib import Path
 
 __CONFIGURATION_FILE_NAME = "config.ini"
+__MONITORS_FILE_NAME = "monitors.json"
+
+__config_parser = None
+__config_parser_lock = threading.Lock()
 
 
 class ConfigurationValidationException(Exception):
@@ -11,29 +16,42 @@ class ConfigurationValidationException(Exception):
 
 
 def initialize_app_configuration():
-    configuration_directory_path = __get_configuration_directory_path()
+    configuration_directory_path = get_configuration_directory_path()
     Path(configuration_directory_path).mkdir(parents=False, exist_ok=True)
     path_to_config_file = configuration_directory_path + __CONFIGURATION_FILE_NAME
     Path(path_to_config_file).touch()
 
 
-def read_configuration(configuration_section: str, expected_mandatory_fields: [] = ()) -> {}:
-    path_to_config_file = __get_configuration_directory_path() + __CONFIGURATION_FILE_NAME
-    config_parser = ConfigParser()
+def read_configuration(configuration_section: str, expected_mandatory_fields: [] = (),
+                       fallback_section: str = None) -> {}:
+    config_parser = __get_config_parser()
+
+    if not config_parser.has_section(configuration_section):
+        raise ConfigurationValidationException(f"A section '{configuration_section}' is not defined in a "
+                                               f"{__CONFIGURATION_FILE_NAME} file")
+
+    configuration = {}
+    if fallback_section is not None and config_parser.has_section(fallback_section):
+        configuration.update(config_parser.items(fallback_section))
+    configuration.update(config_parser.items(configuration_section))
 
-    with codecs.open(path_to_config_file, "r", encoding="utf-8") as config_file:
-        config_parser.read_file(config_file)
-        configuration = dict(config_parser.items(configuration_section))
+    for field in expected_mandatory_fields:
+        if not configuration.get(field):
+            error_message = __prepare_validation_error_message(configuration_section, field)
+            raise ConfigurationValidationException(error_message)
 
-        for field in expected_mandatory_fields:
-            if not configuration.get(field):
-                error_message = __prepare_validation_error_message(configuration_section, field)
-                raise ConfigurationValidationException(error_message)
+    return configuration
 
-        return configuration
 
+def read_optional_configuration(configuration_section: str) -> {}:
+    config_parser = __get_config_parser()
 
-def __get_configuration_directory_path() -> str:
+    if not config_parser.has_section(configuration_section):
+        return {}
+    return dict(config_parser.items(configuration_section))
+
+
+def get_configuration_directory_path() -> str:
     current_platform = platform.system()
     user_home_path = Path.home()
 
@@ -44,6 +62,25 @@ def __get_configuration_directory_path() -> str:
             return str(user_home_path) + "/AppData/Local/yalma/"
 
 
+def get_default_monitors_file_path() -> str:
+    return get_configuration_directory_path() + __MONITORS_FILE_NAME
+
+
+def __get_config_parser() -> ConfigParser:
+    global __config_parser
+
+    with __config_parser_lock:
+        if __config_parser is None:
+            path_to_config_file = get_configuration_directory_path() + __CONFIGURATION_FILE_NAME
+            config_parser = ConfigParser()
+
+            with codecs.open(path_to_config_file, "r", encoding="utf-8") as config_file:
+                config_parser.read_file(config_file)
+
+            __config_parser = config_parser
+        return __config_parser
+
+
 def __prepare_validation_error_message(configuration_section, field) -> str:
     return f"A value for field '{field}' in section '{configuration_section}' is not set in a " \
            f"{__CONFIGURATION_FILE_NAME} file"
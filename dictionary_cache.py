@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import config_loader
+
+__CACHE_DIRECTORY_NAME = "cache/"
+__DEFAULT_TTL_HOURS = 24
+
+__entries = {}
+__entries_lock = threading.Lock()
+__ttl_seconds = None
+
+
+def get_key(uri: str, language: str) -> str:
+    return hashlib.sha1(f"{uri}|{language}".encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> {}:
+    with __entries_lock:
+        entry = __entries.get(key)
+        if entry is None:
+            entry = __entries[key] = __load_entry(key)
+        return entry
+
+
+def is_fresh(entry: {}) -> bool:
+    return entry is not None and time.time() - entry["stored_at"] < __get_ttl_seconds()
+
+
+def put(key: str, payload, etag: str = None, last_modified: str = None):
+    entry = {"stored_at": time.time(), "etag": etag, "last_modified": last_modified, "payload": payload}
+    with __entries_lock:
+        __entries[key] = entry
+    __save_entry(key, entry)
+
+
+def revalidate(key: str, entry: {}):
+    put(key, entry["payload"], entry["etag"], entry["last_modified"])
+
+
+def __get_ttl_seconds() -> float:
+    global __ttl_seconds
+
+    if __ttl_seconds is None:
+        cache_settings = config_loader.read_optional_configuration("cache")
+        __ttl_seconds = float(cache_settings.get("dictionary_ttl_hours", __DEFAULT_TTL_HOURS)) * 60 * 60
+    return __ttl_seconds
+
+
+def __load_entry(key: str) -> {}:
+    try:
+        with open(__get_entry_path(key), "r", encoding="utf-8") as entry_file:
+            return json.load(entry_file)
+    except (OSError, ValueError):
+        return None
+
+
+def __save_entry(key: str, entry: {}):
+    entry_path = __get_entry_path(key)
+    temporary_entry_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        Path(entry_path).parent.mkdir(parents=False, exist_ok=True)
+        with open(temporary_entry_path, "w", encoding="utf-8") as entry_file:
+            json.dump(entry, entry_file)
+        os.replace(temporary_entry_path, entry_path)
+    except OSError as exception:
+        print(f"Unable to store dictionary data in the cache. Details: {exception}")
+
+
+def __get_entry_path(key: str) -> str:
+    return config_loader.get_configuration_directory_path() + __CACHE_DIRECTORY_NAME + key + ".json"
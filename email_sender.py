@@ -1,41 +1,120 @@
 import smtplib
+import ssl
+import threading
+import time
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 import config_loader
+import metrics
 
 _EMAIL_SUBJECT = "[YALMA] Visits are available"
+_HEALTH_CHECK_INTERVAL_SECONDS = 60
+
+__settings = None
+__settings_lock = threading.Lock()
 
 
 class EmailSenderException(Exception):
-    pass
 
+    def __init__(self, message: str, failed_emails: [(str, str, str)] = None):
+        super().__init__(message)
+        self.failed_emails = failed_emails
 
-def __load_email_setting():
-    settings = config_loader.read_configuration("email_settings", ["username", "password", "smtp_server", "smtp_port"])
-    return settings["username"], settings["password"], settings["smtp_server"], settings["smtp_port"]
 
+class SmtpClient:
 
-def send_email(to: str, message: str):
-    username, password, smtp_server, smtp_port = __load_email_setting()
+    def __init__(self, username: str, password: str, smtp_server: str, smtp_port: str):
+        self._username = username
+        self._password = password
+        self._smtp_server = smtp_server
+        self._smtp_port = smtp_port
+        self._connection = None
+        self._last_used_at = 0.0
+        self._lock = threading.Lock()
 
-    email_message = MIMEText(message)
-    email_message["From"] = username
-    email_message["To"] = to
-    email_message["Subject"] = _EMAIL_SUBJECT
+    def send(self, to: str, message: str, html_message: str = None):
+        self.send_batch([(to, message, html_message)])
+
+    def send_batch(self, emails: [(str, str, str)]):
+        failed_emails, failures = [], []
+
+        with self._lock, metrics.timed("smtp"):
+            for email in emails:
+                to, message, html_message = email
+                try:
+                    self._send_with_reconnect(to, _create_email_message(self._username, to, message, html_message))
+                except (smtplib.SMTPException, OSError) as exception:
+                    failed_emails.append(email)
+                    failures.append(f"{to}: {exception}")
+
+        if failures:
+            raise EmailSenderException(f"Unable to send the email. Details: {'; '.join(failures)}", failed_emails)
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    def _send_with_reconnect(self, to: str, email_message: MIMEBase):
+        try:
+            self._get_connection().sendmail(self._username, to, email_message.as_string())
+        except (smtplib.SMTPServerDisconnected, ConnectionError, ssl.SSLError):
+            self._disconnect()
+            self._get_connection().sendmail(self._username, to, email_message.as_string())
+        self._last_used_at = time.monotonic()
+
+    def _get_connection(self) -> smtplib.SMTP_SSL:
+        idle_time = time.monotonic() - self._last_used_at
+        if self._connection is not None and idle_time > _HEALTH_CHECK_INTERVAL_SECONDS and not self._is_alive():
+            self._disconnect()
 
-    mail_server_connection = None
+        if self._connection is None:
+            self._connection = smtplib.SMTP_SSL(self._smtp_server, self._smtp_port)
+            self._connection.ehlo()
+            self._connection.login(self._username, self._password)
+            self._last_used_at = time.monotonic()
+        return self._connection
 
-    try:
-        print("Sending an email message with notification...")
+    def _is_alive(self) -> bool:
+        try:
+            return self._connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
 
-        mail_server_connection = smtplib.SMTP_SSL(smtp_server, smtp_port)
-        mail_server_connection.ehlo()
-        mail_server_connection.login(username, password)
-        mail_server_connection.sendmail(username, to, email_message.as_string())
+    def _disconnect(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.quit()
+        except (smtplib.SMTPException, OSError):
+            self._connection.close()
+        self._connection = None
 
-        print("The notification has been successfully sent")
-    except Exception as exception:
-        raise EmailSenderException(f"Unable to send the email. Details: {exception}") from None
-    finally:
-        if mail_server_connection is not None:
-            mail_server_connection.close()
+
+def __load_email_setting():
+    global __settings
+
+    with __settings_lock:
+        if __settings is None:
+            __settings = config_loader.read_configuration("email_settings",
+                                                          ["username", "password", "smtp_server", "smtp_port"])
+        return __settings["username"], __settings["password"], __settings["smtp_server"], __settings["smtp_port"]
+
+
+def create_client() -> SmtpClient:
+    return SmtpClient(*__load_email_setting())
+
+
+def _create_email_message(username: str, to: str, message: str, html_message: str = None) -> MIMEBase:
+    if html_message is None:
+        email_message = MIMEText(message)
+    else:
+        email_message = MIMEMultipart("alternative")
+        email_message.attach(MIMEText(message, "plain", "utf-8"))
+        email_message.attach(MIMEText(html_message, "html", "utf-8"))
+
+    email_message["From"] = username
+    email_message["To"] = to
+    email_message["Subject"] = _EMAIL_SUBJECT
+    return email_message
@@ -0,0 +1,46 @@
+import json
+import sys
+from datetime import date
+from typing import Iterable, TextIO
+
+from term import DayTerms, Term
+
+JSON = "json"
+NDJSON = "ndjson"
+
+
+def write_items(items: Iterable[{}], output_format: str, stream: TextIO = None) -> int:
+    stream = stream or sys.stdout
+    count = 0
+
+    if output_format == NDJSON:
+        for item in items:
+            stream.write(json.dumps(item, ensure_ascii=False) + "\n")
+            stream.flush()
+            count += 1
+        return count
+
+    stream.write("[")
+    for item in items:
+        stream.write(("," if count else "") + "\n  " + json.dumps(item, ensure_ascii=False))
+        count += 1
+    stream.write("\n]\n" if count else "]\n")
+    stream.flush()
+    return count
+
+
+def write_terms(terms: Iterable[DayTerms], output_format: str, stream: TextIO = None) -> int:
+    visits = (convert_visit(day_terms.date, visit) for day_terms in terms for visit in day_terms.visits)
+    return write_items(visits, output_format, stream)
+
+
+def convert_visit(term_date: date, visit: Term) -> {}:
+    return {
+        "date": term_date.isoformat(),
+        "time": visit.time.strftime("%H:%M"),
+        "doctor_id": visit.doctor.id,
+        "doctor": visit.doctor.name,
+        "clinic_id": visit.clinic.id,
+        "clinic": visit.clinic.name,
+        "part_of_day": visit.part_of_day
+    }
@@ -1,11 +1,22 @@
+import json
+import os
 import random
+import threading
+import time
 import uuid
 from datetime import datetime
 from enum import Enum
+from typing import Callable
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE
 
 import config_loader
+import dictionary_cache
+import metrics
+from circuit_breaker import CircuitBreaker, CircuitBreakerOpenException
+from rate_limiter import RateLimiter
 
 
 class Language(Enum):
@@ -18,38 +29,66 @@ class LuxmedApiException(Exception):
 
 
 __APP_VERSION = "4.29.0"
-__CUSTOM_USER_AGENT = f"Patient Portal; {__APP_VERSION}; {str(uuid.uuid4())}; Android; {str(random.randint(23, 29))};" \
-                      f" {str(uuid.uuid4())}"
-__BASE_DOMAIN = "https://portalpacjenta.luxmed.pl"
-__API_BASE_URL = f"{__BASE_DOMAIN}/PatientPortal/NewPortal"
-__CONFIG = config_loader.read_configuration("luxmed", ["username", "password", "language"])
-
-
-def get_cities() -> []:
+__CONFIGURATION_SECTION = "luxmed"
+__MANDATORY_FIELDS = ["username", "password", "language"]
+__DEFAULT_BASE_DOMAIN = "https://portalpacjenta.luxmed.pl"
+__API_BASE_PATH = "/PatientPortal/NewPortal"
+__SESSION_FILE_NAME = "session.json"
+__ACCOUNT_SESSION_FILE_NAME = "session_{account}.json"
+__DEFAULT_TOKEN_LIFETIME_SECONDS = 3600
+__SESSION_LIFETIME_SECONDS = 15 * 60
+__EXPIRATION_MARGIN_SECONDS = 30
+__CIRCUIT_BREAKER_FILE_NAME = "circuit_breaker.json"
+__DEFAULT_REQUESTS_PER_SECOND = 5
+__DEFAULT_MAX_RETRIES = 3
+__DEFAULT_FAILURE_THRESHOLD = 5
+__DEFAULT_RECOVERY_TIMEOUT_SECONDS = 300
+__RETRY_BASE_DELAY_SECONDS = 1
+__MAX_RETRY_DELAY_SECONDS = 30
+__RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+__accounts = {}
+__accounts_lock = threading.Lock()
+__connection_pool_size = DEFAULT_POOLSIZE
+__requests_per_second = None
+__rate_limiters = {}
+__rate_limiters_lock = threading.Lock()
+__circuit_breaker = None
+__circuit_breaker_lock = threading.Lock()
+
+
+def configure_connections(connection_pool_size: int, requests_per_second: float = None):
+    global __connection_pool_size, __requests_per_second
+
+    __connection_pool_size = max(connection_pool_size, DEFAULT_POOLSIZE)
+    __requests_per_second = requests_per_second
+    with __rate_limiters_lock:
+        __rate_limiters.clear()
+
+
+def get_cities(refresh: bool = False, account: str = None) -> []:
     print("Retrieving cities from the Luxmed API...")
-    return __send_request_for_filters("/Dictionary/cities")
+    return __send_request_for_filters("/Dictionary/cities", refresh, account)
 
 
-def get_services() -> []:
+def get_services(refresh: bool = False, account: str = None) -> []:
     print("Retrieving services from the Luxmed API...")
-    return __send_request_for_filters("/Dictionary/serviceVariantsGroups")
+    return __send_request_for_filters("/Dictionary/serviceVariantsGroups", refresh, account)
 
 
-def get_clinics_and_doctors(city_id: int, service_id: int) -> []:
+def get_clinics_and_doctors(city_id: int, service_id: int, refresh: bool = False, account: str = None) -> []:
     print("Retrieving clinics and doctors from the Luxmed API...")
     return __send_request_for_filters(
-        f"/Dictionary/facilitiesAndDoctors?cityId={city_id}&serviceVariantId={service_id}")
+        f"/Dictionary/facilitiesAndDoctors?cityId={city_id}&serviceVariantId={service_id}", refresh, account)
 
 
 def get_terms(city_id: int, service_id: int, from_date: datetime, to_date: datetime, language: Language,
-              clinic_id: int = None, doctor_id: int = None) -> []:
+              clinic_id: int = None, doctor_id: int = None, account: str = None) -> []:
     print("Getting terms for given search parameters...")
 
-    session = __log_in()
-
     headers = {
         "Accept": "application/json",
-        "accept-language": __CONFIG["language"],
+        "accept-language": __get_config(account)["language"],
         "host": "portalpacjenta.luxmed.pl",
         "Content-Type": "application/json",
         "x-requested-with": "XMLHttpRequest"
@@ -65,73 +104,320 @@ def get_terms(city_id: int, service_id: int, from_date: datetime, to_date: datet
         "doctorsIds": doctor_id,
         "delocalized": "false"
     }
-    response = session.get(f"{__API_BASE_URL}/terms/index", headers=headers, params=params)
+    with metrics.timed("terms_request"):
+        response = __send_authorized_request(account, f"{__get_base_domain()}{__API_BASE_PATH}/terms/index", headers,
+                                             params)
     __validate_response(response)
 
     return response.json()["termsForService"]["termsForDays"]
 
 
-def __send_request_for_filters(uri: str):
-    session = __log_in()
+def __send_request_for_filters(uri: str, refresh: bool = False, account: str = None):
+    language = __get_config(account)["language"]
+    cache_key = dictionary_cache.get_key(uri, language)
+    cached_entry = dictionary_cache.get(cache_key)
+
+    if not refresh and dictionary_cache.is_fresh(cached_entry):
+        return cached_entry["payload"]
+
     headers = {
         "Accept": "application/json",
-        "accept-language": __CONFIG["language"],
+        "accept-language": language,
         "host": "portalpacjenta.luxmed.pl",
         "Content-Type": "application/json",
     }
-    response = session.get(f"{__API_BASE_URL}{uri}", headers=headers)
+    if cached_entry is not None and cached_entry["etag"]:
+        headers["If-None-Match"] = cached_entry["etag"]
+    if cached_entry is not None and cached_entry["last_modified"]:
+        headers["If-Modified-Since"] = cached_entry["last_modified"]
+
+    with metrics.timed("dictionary_request"):
+        response = __send_authorized_request(account, f"{__get_base_domain()}{__API_BASE_PATH}{uri}", headers)
+
+    if response.status_code == 304 and cached_entry is not None:
+        dictionary_cache.revalidate(cache_key, cached_entry)
+        return cached_entry["payload"]
+
     __validate_response(response)
-    return response.json()
+    payload = response.json()
+    dictionary_cache.put(cache_key, payload, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return payload
 
 
-def __log_in() -> requests.Session:
-    access_token = __get_access_token()
+def __send_authorized_request(account: str, url: str, headers: {}, params: {} = None) -> requests.Response:
+    session = __get_session(account)
+    response = __send_request(account, session.get, url, headers=headers, params=params)
+
+    if __is_session_rejected(response):
+        print("The session has expired, logging in again...")
+        __invalidate_session(account, session)
+        session = __get_session(account)
+        response = __send_request(account, session.get, url, headers=headers, params=params)
 
-    session = requests.Session()
+    return response
+
+
+def __send_request(account: str, send: Callable[..., requests.Response], url: str, **kwargs) -> requests.Response:
+    circuit_breaker = __get_circuit_breaker()
+    max_retries = int(__get_api_settings().get("max_retries", __DEFAULT_MAX_RETRIES))
+
+    for attempt in range(max_retries + 1):
+        try:
+            circuit_breaker.before_request()
+        except CircuitBreakerOpenException as exception:
+            raise LuxmedApiException(str(exception)) from None
+
+        __throttle(account, url)
+        endpoint = urlparse(url).path
+        try:
+            response = send(url, **kwargs)
+        except requests.RequestException as exception:
+            metrics.increment("yalma_requests_total", endpoint=endpoint, status="error")
+            if attempt == max_retries:
+                circuit_breaker.record_failure()
+                raise LuxmedApiException(f"Unable to connect to the Luxmed API. Details: {exception}") from None
+            circuit_breaker.record_retry()
+            __wait_before_retry(attempt)
+            continue
+
+        metrics.increment("yalma_requests_total", endpoint=endpoint, status=response.status_code)
+        metrics.increment("yalma_response_bytes_total", len(response.content), endpoint=endpoint)
+
+        if response.status_code not in __RETRYABLE_STATUS_CODES:
+            circuit_breaker.record_success()
+            return response
+
+        if attempt == max_retries:
+            circuit_breaker.record_failure()
+            return response
+        circuit_breaker.record_retry()
+        __wait_before_retry(attempt, response.headers.get("Retry-After"))
+
+
+def __wait_before_retry(attempt: int, retry_after: str = None):
+    delay = random.uniform(0, min(__RETRY_BASE_DELAY_SECONDS * 2 ** (attempt + 1), __MAX_RETRY_DELAY_SECONDS))
+    if retry_after is not None and retry_after.isdigit():
+        delay = max(delay, min(int(retry_after), __MAX_RETRY_DELAY_SECONDS))
+
+    print(f"The Luxmed API is not responding properly, retrying in {delay:.1f} seconds...")
+    time.sleep(delay)
+
+
+def __is_session_rejected(response: requests.Response) -> bool:
+    if response.status_code == 401:
+        return True
+    redirected_to_login_page = bool(response.history) and "/Account/LogIn" in response.url
+    return redirected_to_login_page and "application/json" not in response.headers.get("Content-Type", "")
+
+
+def __get_session(account: str) -> requests.Session:
+    account_state = __get_account_state(account)
+
+    with account_state["lock"]:
+        if account_state["session_state"] is None:
+            account_state["session_state"] = __load_session_state(account)
+
+        session_state = account_state["session_state"]
+        if session_state is not None and __is_still_valid(session_state["session_expires_at"]):
+            return session_state["session"]
+
+        with metrics.timed("login"):
+            session_state = account_state["session_state"] = __log_in(account_state, session_state)
+        __save_session_state(account, session_state)
+        return session_state["session"]
+
+
+def __invalidate_session(account: str, rejected_session: requests.Session):
+    account_state = __get_account_state(account)
+
+    with account_state["lock"]:
+        session_state = account_state["session_state"]
+        if session_state is not None and session_state["session"] is rejected_session:
+            session_state["session_expires_at"] = 0
+            session_state["token_expires_at"] = 0
+
+
+def __get_account_state(account: str) -> {}:
+    with __accounts_lock:
+        account_state = __accounts.get(account)
+        if account_state is None:
+            account_state = __accounts[account] = {
+                "account": account,
+                "lock": threading.Lock(),
+                "session_state": None,
+                "custom_user_agent": __create_custom_user_agent()
+            }
+        return account_state
+
+
+def __create_custom_user_agent() -> str:
+    return f"Patient Portal; {__APP_VERSION}; {str(uuid.uuid4())}; Android; {str(random.randint(23, 29))}; " \
+           f"{str(uuid.uuid4())}"
+
+
+def __log_in(account_state: {}, previous_state: {} = None) -> {}:
+    account = account_state["account"]
+    if previous_state is not None and __is_still_valid(previous_state["token_expires_at"]):
+        access_token, token_expires_at = previous_state["access_token"], previous_state["token_expires_at"]
+        try:
+            return __log_in_to_app(account, access_token, token_expires_at)
+        except LuxmedApiException:
+            print("The stored access token has been rejected, requesting a new one...")
+
+    access_token, token_expires_at = __get_access_token(account, account_state["custom_user_agent"])
+    return __log_in_to_app(account, access_token, token_expires_at)
+
+
+def __log_in_to_app(account: str, access_token: str, token_expires_at: float) -> {}:
+    session = __create_session()
     headers = {
         "authorization": access_token,
-        "accept-language": __CONFIG["language"],
+        "accept-language": __get_config(account)["language"],
         "upgrade-insecure-requests": "1",
         "host": "portalpacjenta.luxmed.pl",
         "Content-Type": "application/json",
         "x-requested-with": "pl.luxmed.pp",
-        "Origin": __BASE_DOMAIN
+        "Origin": __get_base_domain()
     }
     params = {
         "app": "search",
         "client": 3,
         "paymentSupported": "true",
-        "lang": __CONFIG["language"]
+        "lang": __get_config(account)["language"]
     }
-    response = session.get(f"{__BASE_DOMAIN}/PatientPortal/Account/LogInToApp", headers=headers, params=params)
+    login_url = f"{__get_base_domain()}/PatientPortal/Account/LogInToApp"
+    response = __send_request(account, session.get, login_url, headers=headers, params=params)
 
     if response.status_code != 200:
         raise LuxmedApiException("Unexpected response code, cannot log in")
 
-    return session
+    return {
+        "session": session,
+        "access_token": access_token,
+        "token_expires_at": token_expires_at,
+        "session_expires_at": min(token_expires_at, time.time() + __SESSION_LIFETIME_SECONDS)
+    }
 
 
-def __get_access_token() -> str:
+def __get_access_token(account: str, custom_user_agent: str) -> (str, float):
+    config = __get_config(account)
     headers = {"Api-Version": "2.0",
-               "accept-language": __CONFIG["language"],
+               "accept-language": config["language"],
                "Content-Type": "application/x-www-form-urlencoded",
                "accept-encoding": "gzip",
                "x-api-client-identifier": "Android",
                "User-Agent": "okhttp/3.11.0",
-               "Custom-User-Agent": __CUSTOM_USER_AGENT}
+               "Custom-User-Agent": custom_user_agent}
 
-    authentication_body = {"username": __CONFIG["username"],
-                           "password": __CONFIG["password"],
+    authentication_body = {"username": config["username"],
+                           "password": config["password"],
                            "grant_type": "password",
                            "account_id": str(uuid.uuid4())[:35],
                            "client_id": str(uuid.uuid4())
                            }
 
-    response = requests.post(f"{__BASE_DOMAIN}/PatientPortalMobileAPI/api/token", headers=headers,
-                             data=authentication_body)
+    token_url = f"{__get_base_domain()}/PatientPortalMobileAPI/api/token"
+    response = __send_request(account, requests.post, token_url, headers=headers, data=authentication_body)
 
     __validate_response(response)
-    return response.json()["access_token"]
+    token = response.json()
+    token_lifetime = int(token.get("expires_in", __DEFAULT_TOKEN_LIFETIME_SECONDS))
+    return token["access_token"], time.time() + token_lifetime
+
+
+def __load_session_state(account: str) -> {}:
+    try:
+        with open(__get_session_file_path(account), "r", encoding="utf-8") as session_file:
+            stored_state = json.load(session_file)
+    except (OSError, ValueError):
+        return None
+
+    stored_for_other_user = stored_state.get("username") != __get_config(account)["username"]
+    if stored_for_other_user or not __is_still_valid(stored_state.get("token_expires_at", 0)):
+        return None
+
+    session = __create_session()
+    session.cookies.update(stored_state["cookies"])
+    return {
+        "session": session,
+        "access_token": stored_state["access_token"],
+        "token_expires_at": stored_state["token_expires_at"],
+        "session_expires_at": stored_state["session_expires_at"]
+    }
+
+
+def __save_session_state(account: str, session_state: {}):
+    stored_state = {
+        "username": __get_config(account)["username"],
+        "access_token": session_state["access_token"],
+        "token_expires_at": session_state["token_expires_at"],
+        "session_expires_at": session_state["session_expires_at"],
+        "cookies": requests.utils.dict_from_cookiejar(session_state["session"].cookies)
+    }
+    session_file_path = __get_session_file_path(account)
+
+    try:
+        session_file_descriptor = os.open(session_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(session_file_descriptor, "w", encoding="utf-8") as session_file:
+            json.dump(stored_state, session_file)
+    except OSError as exception:
+        print(f"Unable to store the session in {session_file_path}. Details: {exception}")
+
+
+def __create_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=__connection_pool_size, pool_maxsize=__connection_pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def __throttle(account: str, url: str):
+    rate_limiter_key = (account, urlparse(url).netloc)
+    with __rate_limiters_lock:
+        rate_limiter = __rate_limiters.get(rate_limiter_key)
+        if rate_limiter is None:
+            requests_per_second = __requests_per_second or float(
+                __get_config(account).get("requests_per_second", __DEFAULT_REQUESTS_PER_SECOND))
+            rate_limiter = __rate_limiters[rate_limiter_key] = RateLimiter(requests_per_second)
+    rate_limiter.acquire()
+
+
+def __get_circuit_breaker() -> CircuitBreaker:
+    global __circuit_breaker
+
+    with __circuit_breaker_lock:
+        if __circuit_breaker is None:
+            config = __get_api_settings()
+            __circuit_breaker = CircuitBreaker(
+                config_loader.get_configuration_directory_path() + __CIRCUIT_BREAKER_FILE_NAME,
+                int(config.get("failure_threshold", __DEFAULT_FAILURE_THRESHOLD)),
+                float(config.get("recovery_timeout", __DEFAULT_RECOVERY_TIMEOUT_SECONDS)))
+        return __circuit_breaker
+
+
+def __get_config(account: str = None) -> {}:
+    if account is None:
+        return config_loader.read_configuration(__CONFIGURATION_SECTION, __MANDATORY_FIELDS)
+    return config_loader.read_configuration(f"{__CONFIGURATION_SECTION}:{account}", __MANDATORY_FIELDS,
+                                            __CONFIGURATION_SECTION)
+
+
+def __get_api_settings() -> {}:
+    return config_loader.read_optional_configuration(__CONFIGURATION_SECTION)
+
+
+def __get_base_domain() -> str:
+    return __get_api_settings().get("base_url", __DEFAULT_BASE_DOMAIN).rstrip("/")
+
+
+def __get_session_file_path(account: str) -> str:
+    session_file_name = __SESSION_FILE_NAME if account is None else __ACCOUNT_SESSION_FILE_NAME.format(account=account)
+    return config_loader.get_configuration_directory_path() + session_file_name
+
+
+def __is_still_valid(expires_at: float) -> bool:
+    return expires_at - __EXPIRATION_MARGIN_SECONDS > time.time()
 
 
 def __validate_response(response: requests.Response):
@@ -0,0 +1,127 @@
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+__DEFAULT_HOST = "127.0.0.1"
+__DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, float("inf"))
+__DESCRIPTIONS = {
+    "yalma_requests_total": "Number of requests sent to the Luxmed API",
+    "yalma_response_bytes_total": "Number of bytes received from the Luxmed API",
+    "yalma_phase_duration_seconds": "Duration of particular phases of checking visits",
+    "yalma_slots_parsed_total": "Number of visits parsed from the Luxmed API responses",
+    "yalma_slots_matched_total": "Number of parsed visits which match the search criteria",
+    "yalma_notifications_total": "Number of notifications by the outcome of delivery"
+}
+
+__lock = threading.Lock()
+__counters = {}
+__histograms = {}
+
+
+def increment(name: str, value: float = 1, **labels):
+    key = (name, __normalize_labels(labels))
+    with __lock:
+        __counters[key] = __counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels):
+    key = (name, __normalize_labels(labels))
+    with __lock:
+        histogram = __histograms.get(key)
+        if histogram is None:
+            histogram = __histograms[key] = {"count": 0, "sum": 0.0, "buckets": [0] * len(__DURATION_BUCKETS)}
+        histogram["count"] += 1
+        histogram["sum"] += value
+        for index, upper_bound in enumerate(__DURATION_BUCKETS):
+            if value <= upper_bound:
+                histogram["buckets"][index] += 1
+
+
+@contextmanager
+def timed(phase: str):
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("yalma_phase_duration_seconds", time.perf_counter() - started_at, phase=phase)
+
+
+def get_summary() -> {}:
+    with __lock:
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(__counters.items())]
+        phases = {dict(labels)["phase"]: {"count": histogram["count"], "total_seconds": round(histogram["sum"], 6)}
+                  for (name, labels), histogram in sorted(__histograms.items()) if "phase" in dict(labels)}
+        histograms = [{"name": name, "labels": dict(labels), "count": histogram["count"],
+                       "total_seconds": round(histogram["sum"], 6)}
+                      for (name, labels), histogram in sorted(__histograms.items()) if "phase" not in dict(labels)]
+    return {"counters": counters, "phases": phases, "histograms": histograms}
+
+
+def render_prometheus() -> str:
+    lines = []
+    with __lock:
+        for name in sorted({name for name, _ in __counters}):
+            lines.extend(__describe(name, "counter"))
+            for (counter_name, labels), value in sorted(__counters.items()):
+                if counter_name == name:
+                    lines.append(f"{name}{__format_labels(labels)} {value}")
+
+        for name in sorted({name for name, _ in __histograms}):
+            lines.extend(__describe(name, "histogram"))
+            for (histogram_name, labels), histogram in sorted(__histograms.items()):
+                if histogram_name != name:
+                    continue
+                for upper_bound, count in zip(__DURATION_BUCKETS, histogram["buckets"]):
+                    bucket_labels = labels + (("le", "+Inf" if upper_bound == float("inf") else str(upper_bound)),)
+                    lines.append(f"{name}_bucket{__format_labels(bucket_labels)} {count}")
+                lines.append(f"{name}_sum{__format_labels(labels)} {histogram['sum']}")
+                lines.append(f"{name}_count{__format_labels(labels)} {histogram['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def start_http_server(port: int, host: str = __DEFAULT_HOST) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"Metrics are available at http://{host}:{port}/metrics")
+    return server
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, message_format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def __normalize_labels(labels: {}) -> tuple:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def __describe(name: str, metric_type: str) -> [str]:
+    return [f"# HELP {name} {__DESCRIPTIONS.get(name, name)}", f"# TYPE {name} {metric_type}"]
+
+
+def __format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    formatted_labels = ",".join(f'{name}="{__escape(str(value))}"' for name, value in labels)
+    return "{" + formatted_labels + "}"
+
+
+def __escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
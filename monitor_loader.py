@@ -0,0 +1,84 @@
+import codecs
+import json
+from datetime import datetime, date
+
+import slot_index
+from luxmed_api import Language
+
+__DEFAULT_INTERVAL_MINUTES = 15
+__DEFAULT_JITTER_SECONDS = 30
+__MANDATORY_FIELDS = ["email", "city_id", "service_id", "to_date"]
+
+
+class MonitorDefinitionException(Exception):
+    pass
+
+
+def read_monitors(path_to_monitors_file: str) -> [{}]:
+    try:
+        with codecs.open(path_to_monitors_file, "r", encoding="utf-8") as monitors_file:
+            raw_monitors = json.load(monitors_file)
+    except (OSError, ValueError) as exception:
+        raise MonitorDefinitionException(f"Unable to read monitors from {path_to_monitors_file}. "
+                                         f"Details: {exception}") from None
+
+    if not isinstance(raw_monitors, list):
+        raise MonitorDefinitionException(f"Monitors in {path_to_monitors_file} should be defined as a JSON list")
+
+    return [__parse_monitor(index, raw_monitor) for index, raw_monitor in enumerate(raw_monitors)]
+
+
+def resolve_language(language: str) -> Language:
+    return Language.POLISH if language == "pl" else Language.ENGLISH
+
+
+def __parse_monitor(index: int, raw_monitor: {}) -> {}:
+    name = raw_monitor.get("name", f"monitor-{index + 1}")
+
+    for field in __MANDATORY_FIELDS:
+        if raw_monitor.get(field) is None:
+            raise MonitorDefinitionException(f"A value for field '{field}' is not set in monitor '{name}'")
+
+    try:
+        monitor = {
+            "name": name,
+            "email": raw_monitor["email"],
+            "city_id": int(raw_monitor["city_id"]),
+            "service_id": int(raw_monitor["service_id"]),
+            "from_date": __parse_date(raw_monitor.get("from_date")),
+            "to_date": __parse_date(raw_monitor["to_date"]),
+            "time_of_day": int(raw_monitor.get("time_of_day", 0)),
+            "language": resolve_language(raw_monitor.get("language", "pl")),
+            "clinic_id": __parse_optional_id(raw_monitor.get("clinic_id")),
+            "doctor_id": __parse_optional_id(raw_monitor.get("doctor_id")),
+            "interval": float(raw_monitor.get("interval", __DEFAULT_INTERVAL_MINUTES)) * 60,
+            "jitter": float(raw_monitor.get("jitter", __DEFAULT_JITTER_SECONDS)),
+            "account": __parse_optional_account(raw_monitor.get("account")),
+            "key": None
+        }
+    except ValueError as exception:
+        raise MonitorDefinitionException(f"Monitor '{name}' is not valid. Details: {exception}") from None
+
+    if monitor["time_of_day"] not in range(0, 4):
+        raise MonitorDefinitionException(f"A value for field 'time_of_day' in monitor '{name}' should be in 0-3 range")
+
+    if not raw_monitor.get("notify_all", False):
+        monitor["key"] = slot_index.get_monitor_key(monitor["email"], monitor["city_id"], monitor["service_id"],
+                                                    monitor["time_of_day"], monitor["language"], monitor["clinic_id"],
+                                                    monitor["doctor_id"], monitor["account"])
+
+    return monitor
+
+
+def __parse_date(raw_date: str) -> date:
+    if raw_date is None:
+        return None
+    return datetime.strptime(raw_date, "%Y-%m-%d").date()
+
+
+def __parse_optional_account(raw_account) -> str:
+    return str(raw_account) if raw_account is not None else None
+
+
+def __parse_optional_id(raw_id) -> int:
+    return int(raw_id) if raw_id is not None else None
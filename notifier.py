@@ -0,0 +1,347 @@
+import json
+import platform
+import queue
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable
+
+import config_loader
+import metrics
+from config_loader import ConfigurationValidationException
+
+EMAIL = "email"
+WEBHOOK = "webhook"
+FILE = "file"
+DESKTOP = "desktop"
+
+_DEFAULT_SINKS = EMAIL
+_DEFAULT_RETRY_DELAY_SECONDS = 1
+_MAX_RETRY_DELAY_SECONDS = 60
+_DEFAULT_WEBHOOK_TIMEOUT_SECONDS = 5
+_STANDARD_OUTPUT = "-"
+_NOTIFICATION_FORMAT = "notification"
+_VISITS_FORMAT = "visits"
+_DESKTOP_TITLE = "Yalma"
+
+__workers = None
+
+
+class NotifierException(Exception):
+
+    def __init__(self, message: str, failed_notifications: [{}] = None):
+        super().__init__(message)
+        self.failed_notifications = failed_notifications
+
+
+class Sink:
+    name = None
+    default_max_retries = 0
+    default_batch_size = 1
+
+    def __init__(self, settings: {}):
+        self.max_retries = int(settings.get("max_retries", self.default_max_retries))
+        self.batch_size = max(1, int(settings.get("batch_size", self.default_batch_size)))
+        self.retry_delay = float(settings.get("retry_delay", _DEFAULT_RETRY_DELAY_SECONDS))
+
+    def send_batch(self, notifications: [{}]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class EmailSink(Sink):
+    name = EMAIL
+    default_max_retries = 2
+    default_batch_size = 20
+
+    def __init__(self, settings: {}):
+        import email_sender
+
+        super().__init__(settings)
+        self._client = email_sender.create_client()
+
+    def send_batch(self, notifications: [{}]):
+        from email_sender import EmailSenderException
+
+        emails = [(notification["to"], notification["message"], notification["html_message"])
+                  for notification in notifications]
+        try:
+            self._client.send_batch(emails)
+        except EmailSenderException as exception:
+            failed_notifications = [notification for notification, email in zip(notifications, emails)
+                                    if any(email is failed_email for failed_email in exception.failed_emails)]
+            raise NotifierException(str(exception), failed_notifications) from None
+
+    def close(self):
+        self._client.close()
+
+
+class WebhookSink(Sink):
+    name = WEBHOOK
+    default_max_retries = 3
+    default_batch_size = 50
+
+    def __init__(self, settings: {}):
+        import requests
+
+        super().__init__(settings)
+        if not settings.get("url"):
+            raise ConfigurationValidationException(f"A value for field 'url' in section 'notifier:{WEBHOOK}' is not "
+                                                   f"set in a config.ini file")
+        self._url = settings["url"]
+        self._timeout = float(settings.get("timeout", _DEFAULT_WEBHOOK_TIMEOUT_SECONDS))
+        self._session = requests.Session()
+
+    def send_batch(self, notifications: [{}]):
+        import requests
+
+        payload = {"notifications": [_to_json_object(notification) for notification in notifications]}
+        try:
+            response = self._session.post(self._url, json=payload, timeout=self._timeout)
+        except requests.RequestException as exception:
+            raise NotifierException(f"Unable to call the webhook. Details: {exception}") from None
+
+        if response.status_code >= 300:
+            raise NotifierException(f"The webhook has responded with the {response.status_code} status code")
+
+    def close(self):
+        self._session.close()
+
+
+class FileSink(Sink):
+    name = FILE
+
+    def __init__(self, settings: {}):
+        super().__init__(settings)
+        self._path = settings.get("path", _STANDARD_OUTPUT)
+        self._format = settings.get("format", _NOTIFICATION_FORMAT)
+        self._stream = sys.stdout if self._path == _STANDARD_OUTPUT else None
+
+    def send_batch(self, notifications: [{}]):
+        if self._format == _VISITS_FORMAT:
+            json_objects = [{"to": notification["to"], "created_at": _format_created_at(notification), **visit}
+                            for notification in notifications for visit in notification["visits"]]
+        else:
+            json_objects = [_to_json_object(notification) for notification in notifications]
+
+        lines = "".join(json.dumps(json_object, ensure_ascii=False) + "\n" for json_object in json_objects)
+        if self._stream is not None:
+            self._stream.write(lines)
+            self._stream.flush()
+            return
+
+        try:
+            with open(self._path, "a", encoding="utf-8") as notifications_file:
+                notifications_file.write(lines)
+        except OSError as exception:
+            raise NotifierException(f"Unable to write notifications to {self._path}. Details: {exception}") from None
+
+
+class DesktopSink(Sink):
+    name = DESKTOP
+    default_batch_size = 10
+
+    def __init__(self, settings: {}):
+        super().__init__(settings)
+        if platform.system() not in ("Linux", "Darwin"):
+            raise ConfigurationValidationException("Desktop notifications are supported only on GNU/Linux and Mac")
+
+    def send_batch(self, notifications: [{}]):
+        visits_count = sum(len(notification["visits"]) for notification in notifications)
+        recipients = ", ".join(sorted({notification["to"] for notification in notifications}))
+        body = f"{visits_count} new visit(s) are available for {recipients}"
+
+        if platform.system() == "Darwin":
+            command = ["osascript", "-e",
+                       f"display notification {json.dumps(body)} with title {json.dumps(_DESKTOP_TITLE)}"]
+        else:
+            command = ["notify-send", f"--app-name={_DESKTOP_TITLE}", _DESKTOP_TITLE, body]
+
+        try:
+            subprocess.run(command, check=True, capture_output=True, timeout=10)
+        except (OSError, subprocess.SubprocessError) as exception:
+            raise NotifierException(f"Unable to show a desktop notification. Details: {exception}") from None
+
+
+class Delivery:
+
+    def __init__(self, sinks_count: int, on_delivered: Callable[[], None] = None):
+        self._remaining_sinks = sinks_count
+        self._succeeded = True
+        self._on_delivered = on_delivered
+        self._lock = threading.Lock()
+
+    def complete(self, succeeded: bool):
+        with self._lock:
+            self._remaining_sinks -= 1
+            self._succeeded = self._succeeded and succeeded
+            if self._remaining_sinks > 0 or not self._succeeded or self._on_delivered is None:
+                return
+
+        try:
+            self._on_delivered()
+        except Exception as exception:
+            print(f"Unable to complete the delivery of the notification. Details: {exception!r}")
+
+
+class SinkWorker:
+
+    def __init__(self, sink: Sink):
+        self.failures = 0
+        self._sink = sink
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._deliver, name=f"notifier-{sink.name}", daemon=True)
+        self._worker.start()
+
+    def put(self, notification: {}, delivery: Delivery):
+        self._queue.put((notification, delivery))
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+        self._sink.close()
+
+    def _deliver(self):
+        while True:
+            notification = self._queue.get()
+            if notification is None:
+                return
+
+            batch = [notification]
+            while len(batch) < self._sink.batch_size:
+                try:
+                    notification = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if notification is None:
+                    self._deliver_batch(batch)
+                    return
+                batch.append(notification)
+
+            self._deliver_batch(batch)
+
+    def _deliver_batch(self, batch: [({}, Delivery)]):
+        notifications = [notification for notification, _ in batch]
+        try:
+            failed_notifications = _deliver_with_retries(self._sink, notifications)
+        except Exception as exception:
+            metrics.increment("yalma_notifications_total", len(notifications), sink=self._sink.name, outcome="failed")
+            print(f"[{self._sink.name}] Unable to deliver {len(notifications)} notification(s) due to an unexpected "
+                  f"error. Details: {exception!r}")
+            failed_notifications = notifications
+
+        self.failures += len(failed_notifications)
+        for notification, delivery in batch:
+            delivery.complete(not any(notification is failed for failed in failed_notifications))
+
+
+@contextmanager
+def background_dispatch(sinks: [Sink] = None):
+    global __workers
+
+    workers = [SinkWorker(sink) for sink in (sinks if sinks is not None else create_sinks())]
+    __workers = workers
+    try:
+        yield
+    finally:
+        __workers = None
+        for worker in workers:
+            worker.close()
+
+    failures = sum(worker.failures for worker in workers)
+    if failures:
+        raise NotifierException(f"Unable to deliver {failures} notification(s) in the background")
+
+
+def notify(notification: {}, on_delivered: Callable[[], None] = None):
+    workers = __workers
+    if workers is not None:
+        delivery = Delivery(len(workers), on_delivered)
+        for worker in workers:
+            worker.put(notification, delivery)
+        print("The notification has been queued for delivery")
+        return
+
+    failures = []
+    for sink in create_sinks():
+        try:
+            if _deliver_with_retries(sink, [notification]):
+                failures.append(sink.name)
+        finally:
+            sink.close()
+
+    if failures:
+        raise NotifierException(f"Unable to deliver the notification through: {', '.join(failures)}")
+
+    if on_delivered is not None:
+        on_delivered()
+
+
+def create_output_sink(visits_per_line: bool) -> Sink:
+    return FileSink({"path": _STANDARD_OUTPUT, "format": _VISITS_FORMAT if visits_per_line else _NOTIFICATION_FORMAT})
+
+
+def create_sinks() -> [Sink]:
+    sink_types = {sink_type.name: sink_type for sink_type in (EmailSink, WebhookSink, FileSink, DesktopSink)}
+    sink_names = config_loader.read_optional_configuration("notifications").get("sinks", _DEFAULT_SINKS)
+
+    sinks = []
+    for sink_name in filter(None, (name.strip().lower() for name in sink_names.split(","))):
+        if sink_name not in sink_types:
+            raise ConfigurationValidationException(f"Unknown notification sink '{sink_name}', available sinks: "
+                                                   f"{', '.join(sink_types)}")
+        sinks.append(sink_types[sink_name](config_loader.read_optional_configuration(f"notifier:{sink_name}")))
+    return sinks
+
+
+def _deliver_with_retries(sink: Sink, notifications: [{}]) -> [{}]:
+    for attempt in range(sink.max_retries + 1):
+        try:
+            with metrics.timed("notification"):
+                sink.send_batch(notifications)
+        except NotifierException as exception:
+            failed_notifications = exception.failed_notifications or notifications
+            _record_delivery(sink, [notification for notification in notifications
+                                    if not any(notification is failed for failed in failed_notifications)])
+            notifications = failed_notifications
+            if attempt == sink.max_retries:
+                metrics.increment("yalma_notifications_total", len(notifications), sink=sink.name, outcome="failed")
+                print(f"[{sink.name}] Unable to deliver {len(notifications)} notification(s). Details: {exception}")
+                return notifications
+
+            delay = min(sink.retry_delay * 2 ** attempt, _MAX_RETRY_DELAY_SECONDS)
+            print(f"[{sink.name}] Delivery has failed, retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
+            continue
+
+        _record_delivery(sink, notifications)
+        print(f"[{sink.name}] {len(notifications)} notification(s) have been successfully delivered")
+        return []
+
+
+def _record_delivery(sink: Sink, delivered_notifications: [{}]):
+    if not delivered_notifications:
+        return
+
+    metrics.increment("yalma_notifications_total", len(delivered_notifications), sink=sink.name, outcome="sent")
+    for notification in delivered_notifications:
+        metrics.observe("yalma_notification_latency_seconds", time.time() - notification["created_at"],
+                        sink=sink.name)
+
+
+def _to_json_object(notification: {}) -> {}:
+    return {
+        "to": notification["to"],
+        "created_at": _format_created_at(notification),
+        "visits": notification["visits"],
+        "message": notification["message"]
+    }
+
+
+def _format_created_at(notification: {}) -> str:
+    return datetime.fromtimestamp(notification["created_at"]).astimezone().isoformat()
@@ -0,0 +1,50 @@
+from itertools import zip_longest
+
+import booking_service
+
+
+def plan_queries(monitors: [{}]) -> [{}]:
+    queries = {}
+
+    for monitor in monitors:
+        query_key = (monitor["account"], monitor["city_id"], monitor["service_id"], monitor["language"])
+        from_date = booking_service.get_monitor_from_date(monitor)
+        query = queries.get(query_key)
+
+        if query is None:
+            queries[query_key] = {
+                "city_id": monitor["city_id"],
+                "service_id": monitor["service_id"],
+                "language": monitor["language"],
+                "account": monitor["account"],
+                "from_date": from_date,
+                "to_date": monitor["to_date"],
+                "monitors": [monitor]
+            }
+        else:
+            query["from_date"] = min(query["from_date"], from_date)
+            query["to_date"] = max(query["to_date"], monitor["to_date"])
+            query["monitors"].append(monitor)
+
+    return __interleave_accounts(list(queries.values()))
+
+
+def execute_query(query: {}) -> [({}, [{}])]:
+    monitors = query["monitors"]
+
+    if len(monitors) == 1:
+        return [(monitors[0], booking_service.get_available_terms_for_monitor(monitors[0]))]
+
+    raw_terms = booking_service.get_raw_terms(query["city_id"], query["service_id"], query["from_date"],
+                                              query["to_date"], query["language"], query["account"])
+    return [(monitor, list(booking_service.filter_available_terms_for_monitor(raw_terms, monitor)))
+            for monitor in monitors]
+
+
+def __interleave_accounts(queries: [{}]) -> [{}]:
+    queries_per_account = {}
+    for query in queries:
+        queries_per_account.setdefault(query["account"], []).append(query)
+
+    return [query for queries_round in zip_longest(*queries_per_account.values()) for query in queries_round
+            if query is not None]
@@ -0,0 +1,27 @@
+import threading
+import time
+
+
+class RateLimiter:
+
+    def __init__(self, rate: float, burst: int = 1):
+        self._rate = rate
+        self._capacity = max(1, burst)
+        self._tokens = float(self._capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                waiting_time = (1 - self._tokens) / self._rate
+            time.sleep(waiting_time)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
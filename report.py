@@ -1,19 +1,21 @@
-from datetime import datetime
+from typing import Iterable
+
+from term import DayTerms
 
 
 class Report:
 
     @staticmethod
-    def __generate_report(all_terms: []) -> {}:
+    def __generate_report(all_terms: Iterable[DayTerms]) -> {}:
         terms = []
         overall_count = 0
 
-        for term in all_terms:
-            visits_in_clinics = Report.__group_visits_by_clinic(term)
+        for day_terms in all_terms:
+            visits_in_clinics = Report.__group_visits_by_clinic(day_terms)
 
-            date = term["date"]
-            count = len(term["visits"])
-            term = {"date": date, "count": count, "visits": term["visits"], "visits_in_clinics": visits_in_clinics}
+            count = len(day_terms.visits)
+            term = {"date": day_terms.date, "count": count, "visits": day_terms.visits,
+                    "visits_in_clinics": visits_in_clinics}
 
             terms.append(term)
             overall_count += count
@@ -21,33 +23,15 @@ class Report:
         return {"overall_count": overall_count, "terms": terms}
 
     @staticmethod
-    def __group_visits_by_clinic(visits: []) -> []:
-        visits_in_clinics = []
-
+    def __group_visits_by_clinic(day_terms: DayTerms) -> []:
         raw_grouped_visits = {}
-        for visit in visits["visits"]:
-            clinic_name = visit["clinic_name"]
-            raw_grouped_visits[clinic_name] = raw_grouped_visits.get(clinic_name, [])
-            raw_grouped_visits[clinic_name].append(visit)
-
-        for clinic_name in raw_grouped_visits:
-            old_visit_definitions = raw_grouped_visits[clinic_name]
-            new_visits_definitions = []
-
-            for definition in old_visit_definitions:
-                doctor_name = definition["doctor_name"]
-                time = definition["time"]
-                visit_details = {"doctor_name": doctor_name, "time": time}
-                new_visits_definitions.append(visit_details)
-
-            visits_in_clinic_count = len(new_visits_definitions)
-            visit_details = {"clinic_name": clinic_name, "count": visits_in_clinic_count,
-                             "visits": new_visits_definitions}
-            visits_in_clinics.append(visit_details)
+        for visit in day_terms.visits:
+            raw_grouped_visits.setdefault(visit.clinic.name, []).append(visit)
 
-        return visits_in_clinics
+        return [{"clinic_name": clinic_name, "count": len(visits), "visits": visits}
+                for clinic_name, visits in raw_grouped_visits.items()]
 
-    def __init__(self, all_terms):
+    def __init__(self, all_terms: Iterable[DayTerms]):
         self._report = Report.__generate_report(all_terms)
 
     def get_report(self) -> {}:
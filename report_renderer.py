@@ -0,0 +1,95 @@
+from html import escape
+from string import Template
+
+import utils
+from report import Report
+
+TEXT = "text"
+HTML = "html"
+
+__TEXT_SUMMARY_HEADER = Template("Overall number of visits: $overall_count\n\n")
+__TEXT_SUMMARY_DAY = Template("Date: $date\nVisits available in that day: $count\n"
+                              "Number of visits in particular clinics: \n")
+__TEXT_SUMMARY_CLINIC = Template("* $clinic_name: $count\n")
+__TEXT_SUMMARY_DAY_END = "\n"
+__TEXT_DETAILS_HEADER = "\n\n--------- REPORT DETAILS ---------"
+__TEXT_DETAILS_DAY = Template("\nDate: $date\n")
+__TEXT_DETAILS_CLINIC = Template("\nClinic name: $clinic_name\n")
+__TEXT_DETAILS_VISIT = Template("[$time] $doctor_name\n")
+__TEXT_DETAILS_OMITTED = Template("\n... and $count more visit(s), which are not listed in this report\n")
+
+__HTML_HEADER = "<!DOCTYPE html>\n<html>\n<body style=\"font-family: sans-serif;\">\n"
+__HTML_SUMMARY_HEADER = Template("<h2>Overall number of visits: $overall_count</h2>\n<table border=\"1\" "
+                                 "cellpadding=\"4\" cellspacing=\"0\">\n<tr><th>Date</th><th>Clinic</th>"
+                                 "<th>Visits</th></tr>\n")
+__HTML_SUMMARY_CLINIC = Template("<tr><td>$date</td><td>$clinic_name</td><td>$count</td></tr>\n")
+__HTML_SUMMARY_END = "</table>\n"
+__HTML_DETAILS_HEADER = "<h2>Report details</h2>\n"
+__HTML_DETAILS_DAY = Template("<h3>$date ($count)</h3>\n")
+__HTML_DETAILS_CLINIC = Template("<h4>$clinic_name</h4>\n<ul>\n")
+__HTML_DETAILS_VISIT = Template("<li><b>$time</b> $doctor_name</li>\n")
+__HTML_DETAILS_CLINIC_END = "</ul>\n"
+__HTML_DETAILS_OMITTED = Template("<p><i>... and $count more visit(s), which are not listed in this report</i></p>\n")
+__HTML_FOOTER = "</body>\n</html>\n"
+
+
+def render(report: Report, report_format: str = TEXT, max_visits: int = None) -> (str, str):
+    generated_report = report.get_report()
+    render_html = report_format == HTML
+    overall_count = generated_report["overall_count"]
+
+    text_summary = [__TEXT_SUMMARY_HEADER.substitute(overall_count=overall_count)]
+    text_details = [__TEXT_DETAILS_HEADER]
+    html_summary = [__HTML_HEADER, __HTML_SUMMARY_HEADER.substitute(overall_count=overall_count)]
+    html_details = [__HTML_DETAILS_HEADER]
+    listed_visits_count = 0
+
+    for term in generated_report["terms"]:
+        date = utils.make_date_human_ready(term["date"])
+        list_details = max_visits is None or listed_visits_count < max_visits
+
+        text_summary.append(__TEXT_SUMMARY_DAY.substitute(date=date, count=term["count"]))
+        if list_details:
+            text_details.append(__TEXT_DETAILS_DAY.substitute(date=date))
+            if render_html:
+                html_details.append(__HTML_DETAILS_DAY.substitute(date=date, count=term["count"]))
+
+        for visits_in_clinic in term["visits_in_clinics"]:
+            clinic_name, count = visits_in_clinic["clinic_name"], visits_in_clinic["count"]
+            text_summary.append(__TEXT_SUMMARY_CLINIC.substitute(clinic_name=clinic_name, count=count))
+            if render_html:
+                html_summary.append(__HTML_SUMMARY_CLINIC.substitute(date=date, clinic_name=escape(clinic_name),
+                                                                     count=count))
+            if not list_details:
+                continue
+
+            visits = visits_in_clinic["visits"]
+            if max_visits is not None:
+                visits = visits[:max_visits - listed_visits_count]
+            listed_visits_count += len(visits)
+            list_details = max_visits is None or listed_visits_count < max_visits
+
+            text_details.append(__TEXT_DETAILS_CLINIC.substitute(clinic_name=clinic_name))
+            text_details.extend(__TEXT_DETAILS_VISIT.substitute(time=utils.make_time_human_ready(visit.time),
+                                                                doctor_name=visit.doctor.name) for visit in visits)
+            if render_html:
+                html_details.append(__HTML_DETAILS_CLINIC.substitute(clinic_name=escape(clinic_name)))
+                html_details.extend(__HTML_DETAILS_VISIT.substitute(time=utils.make_time_human_ready(visit.time),
+                                                                    doctor_name=escape(visit.doctor.name))
+                                    for visit in visits)
+                html_details.append(__HTML_DETAILS_CLINIC_END)
+
+        text_summary.append(__TEXT_SUMMARY_DAY_END)
+
+    omitted_visits_count = overall_count - listed_visits_count
+    if omitted_visits_count > 0:
+        text_details.append(__TEXT_DETAILS_OMITTED.substitute(count=omitted_visits_count))
+        html_details.append(__HTML_DETAILS_OMITTED.substitute(count=omitted_visits_count))
+
+    text_message = "".join(text_summary) + "".join(text_details)
+    if not render_html:
+        return text_message, None
+
+    html_summary.append(__HTML_SUMMARY_END)
+    html_details.append(__HTML_FOOTER)
+    return text_message, "".join(html_summary) + "".join(html_details)
@@ -1,53 +1,66 @@
-import email_sender
-import utils
+import time
+from functools import partial
+from typing import Callable, Iterable
+
+import config_loader
+import json_output
+import metrics
+import notifier
+import report_renderer
+import slot_index
 from report import Report
+from term import DayTerms
 
+__DEFAULT_MAX_VISITS = 500
+
+
+def make_report(terms: Iterable[DayTerms], email_address: str, monitor_key: str = None):
+    if monitor_key is not None:
+        terms = __get_new_terms(terms, monitor_key)
 
-def make_report(terms: {}, email_address: str):
     report = Report(terms)
 
     if report.is_any_visit_available():
         print("Terms have been found. Notification will be sent.")
-        __notify_about_visits_availability(email_address, report)
+        on_delivered = partial(slot_index.mark_as_seen, monitor_key, terms) if monitor_key is not None else None
+        __notify_about_visits_availability(email_address, report, on_delivered)
     else:
         print("There are no terms available. Notification will not be sent.")
 
 
-def __notify_about_visits_availability(email_address: str, report: Report):
-    notification_message = __create_report_summary(report) + __create_report_details(report)
-    email_sender.send_email(email_address, notification_message)
-
-
-def __create_report_summary(report: Report) -> str:
-    generated_report = report.get_report()
-
-    report_summary = "Overall number of visits: " + str(generated_report["overall_count"]) + "\n\n"
-
-    for term in generated_report["terms"]:
-        report_summary += "Date: " + utils.make_date_human_ready(term["date"]) + "\n" + \
-                          "Visits available in that day: " + str(
-            term["count"]) + "\nNumber of visits in particular clinics: \n"
-
-        for visit in term["visits_in_clinics"]:
-            report_summary += "* " + visit["clinic_name"] + ": " + str(visit["count"]) + "\n"
+def __get_new_terms(terms: Iterable[DayTerms], monitor_key: str) -> [DayTerms]:
+    with metrics.timed("slot_index"):
+        new_terms, vanished_visits_count = slot_index.find_new_terms(monitor_key, terms)
+    new_visits_count = sum(len(day_terms.visits) for day_terms in new_terms)
+    print(f"New visits since the last check: {new_visits_count}, visits which are no longer available: "
+          f"{vanished_visits_count}")
+    return new_terms
 
-        report_summary += "\n"
 
-    return report_summary
+def __notify_about_visits_availability(email_address: str, report: Report, on_delivered: Callable[[], None] = None):
+    report_format, max_visits = __load_report_settings()
 
+    with metrics.timed("report"):
+        notification_message, html_notification_message = report_renderer.render(report, report_format, max_visits)
+    notifier.notify(__create_notification(email_address, report, notification_message, html_notification_message),
+                    on_delivered)
 
-def __create_report_details(report: Report) -> str:
-    generated_report = report.get_report()
 
-    report_details = "\n\n--------- REPORT DETAILS ---------"
+def __create_notification(email_address: str, report: Report, message: str, html_message: str = None) -> {}:
+    visits = [json_output.convert_visit(term["date"], visit) for term in report.get_report()["terms"]
+              for visit in term["visits"]]
 
-    for term in generated_report["terms"]:
-        report_details += "\n" + "Date: " + utils.make_date_human_ready(term["date"]) + "\n"
+    return {
+        "to": email_address,
+        "created_at": time.time(),
+        "message": message,
+        "html_message": html_message,
+        "visits": visits
+    }
 
-        for visit in term["visits_in_clinics"]:
-            report_details += "\nClinic name: " + visit["clinic_name"] + "\n"
-            for visits_in_day in visit["visits"]:
-                report_details += "[" + utils.make_time_human_ready(visits_in_day["time"]) + "] " \
-                                  + visits_in_day["doctor_name"] + "\n"
 
-    return report_details
+def __load_report_settings() -> (str, int):
+    settings = config_loader.read_optional_configuration("report")
+    report_format = settings.get("format", report_renderer.TEXT).lower()
+    max_visits = int(settings.get("max_visits", __DEFAULT_MAX_VISITS)) or None
+    return report_format, max_visits
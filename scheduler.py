@@ -0,0 +1,92 @@
+import heapq
+import random
+import threading
+import time
+from datetime import date
+
+from requests import RequestException
+
+import booking_service
+import notifier
+import report_service
+import terms_fetcher
+from config_loader import ConfigurationValidationException
+from adaptive_polling import AdaptivePollingPolicy
+from luxmed_api import LuxmedApiException
+from notifier import NotifierException, Sink
+
+__MAX_BACKOFF_SECONDS = 6 * 60 * 60
+
+
+def run(monitors: [{}], polling_policy: AdaptivePollingPolicy = None, sinks: [Sink] = None):
+    monitors_per_account = {}
+    for monitor in monitors:
+        monitors_per_account.setdefault(monitor["account"], []).append(monitor)
+
+    print(f"Scheduling {len(monitors)} monitor(s) for {len(monitors_per_account)} account(s)...")
+
+    stop_event = threading.Event()
+    workers = [threading.Thread(target=__run_monitors, args=(account_monitors, polling_policy, stop_event),
+                                name=f"scheduler-{account or 'default'}", daemon=True)
+               for account, account_monitors in monitors_per_account.items()]
+
+    with notifier.background_dispatch(sinks):
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            stop_event.set()
+            terms_fetcher.shutdown()
+
+    print("There are no more monitors to run")
+
+
+def __run_monitors(monitors: [{}], polling_policy: AdaptivePollingPolicy, stop_event: threading.Event):
+    queue = [(time.time() + random.uniform(0, monitor["jitter"]), index) for index, monitor in enumerate(monitors)]
+    heapq.heapify(queue)
+    failures = [0] * len(monitors)
+
+    while queue:
+        next_run, index = heapq.heappop(queue)
+        if stop_event.wait(max(0.0, next_run - time.time())):
+            return
+
+        monitor = monitors[index]
+        if monitor["to_date"] < date.today():
+            print(f"[{monitor['name']}] The monitoring period has ended, the monitor will not be run again")
+            continue
+
+        try:
+            failures[index] = __run_monitor(monitor, failures[index], polling_policy)
+        except Exception as exception:
+            print(f"[{monitor['name']}] Unable to check the availability of visits. Details: {exception!r}")
+            failures[index] += 1
+        heapq.heappush(queue, (time.time() + __get_delay(monitor, failures[index], polling_policy), index))
+
+
+def __run_monitor(monitor: {}, failures: int, polling_policy: AdaptivePollingPolicy = None) -> int:
+    print(f"[{monitor['name']}] Checking the availability of visits...")
+
+    try:
+        available_terms = booking_service.get_available_terms_for_monitor(monitor)
+    except (LuxmedApiException, RequestException, ConfigurationValidationException) as exception:
+        print(f"[{monitor['name']}] Unable to get terms from the Luxmed API. Details: {exception}")
+        return failures + 1
+
+    if polling_policy is not None:
+        polling_policy.record_poll(monitor, available_terms)
+
+    try:
+        report_service.make_report(available_terms, monitor["email"], monitor["key"])
+    except NotifierException as exception:
+        print(f"[{monitor['name']}] {exception}")
+
+    return 0
+
+
+def __get_delay(monitor: {}, failures: int, polling_policy: AdaptivePollingPolicy = None) -> float:
+    interval = polling_policy.get_interval(monitor) if polling_policy is not None else monitor["interval"]
+    backoff = min(interval * (2 ** failures - 1), __MAX_BACKOFF_SECONDS)
+    return interval + backoff + random.uniform(0, monitor["jitter"])
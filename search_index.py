@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+
+import config_loader
+
+__INDEX_DIRECTORY_NAME = "cache/"
+__INDEX_FILE_NAME = "index_{name}.json"
+__POLISH_CHARACTERS = str.maketrans("ąćęłńóśźżĄĆĘŁŃÓŚŹŻ", "acelnoszzACELNOSZZ")
+__TOKEN_PATTERN = re.compile(r"\w+")
+__EXACT_MATCH_SCORE = 3.0
+__PREFIX_MATCH_SCORE = 2.0
+__MIN_SIMILARITY = 0.4
+
+__indexes = {}
+__indexes_lock = threading.Lock()
+
+
+def search(name: str, items: [{}], query: str, limit: int = None) -> [{}]:
+    index = __get_index(name, items)
+    query_tokens = __tokenize(query)
+    if not query_tokens:
+        return []
+
+    scores = None
+    for query_token in query_tokens:
+        token_scores = __score_token(index, query_token)
+        if scores is None:
+            scores = token_scores
+        else:
+            scores = {item_index: score + token_scores[item_index] for item_index, score in scores.items()
+                      if item_index in token_scores}
+
+    ranking = sorted(scores, key=lambda item_index: (-scores[item_index], len(index["names"][item_index]),
+                                                     index["names"][item_index]))
+    return [index["items"][item_index] for item_index in ranking[:limit]]
+
+
+def __fold(text: str) -> str:
+    decomposed_text = unicodedata.normalize("NFKD", text.translate(__POLISH_CHARACTERS))
+    return "".join(character for character in decomposed_text if not unicodedata.combining(character)).lower()
+
+
+def __score_token(index: {}, query_token: str) -> {}:
+    token_scores = {}
+    tokens = index["tokens"]
+
+    for item_index in index["postings"].get(query_token, []):
+        token_scores[item_index] = __EXACT_MATCH_SCORE
+
+    position = bisect_left(tokens, query_token)
+    while position < len(tokens) and tokens[position].startswith(query_token):
+        for item_index in index["postings"][tokens[position]]:
+            token_scores.setdefault(item_index, __PREFIX_MATCH_SCORE)
+        position += 1
+
+    if token_scores:
+        return token_scores
+
+    query_trigrams = __get_trigrams(query_token)
+    common_trigrams = {}
+    for trigram in query_trigrams:
+        for token in index["trigrams"].get(trigram, []):
+            common_trigrams[token] = common_trigrams.get(token, 0) + 1
+
+    for token, common_count in common_trigrams.items():
+        similarity = common_count / (len(query_trigrams) + len(__get_trigrams(token)) - common_count)
+        if similarity >= __MIN_SIMILARITY:
+            for item_index in index["postings"][token]:
+                token_scores[item_index] = max(token_scores.get(item_index, 0.0), similarity)
+
+    return token_scores
+
+
+def __get_index(name: str, items: [{}]) -> {}:
+    fingerprint = hashlib.sha1(json.dumps(items, sort_keys=True).encode("utf-8")).hexdigest()
+
+    with __indexes_lock:
+        index = __indexes.get(name)
+        if index is None or index["fingerprint"] != fingerprint:
+            index = __load_index(name)
+        if index is None or index["fingerprint"] != fingerprint:
+            index = __build_index(fingerprint, items)
+            __save_index(name, index)
+        __indexes[name] = index
+        return index
+
+
+def __build_index(fingerprint: str, items: [{}]) -> {}:
+    postings = {}
+    for item_index, item in enumerate(items):
+        for token in set(__tokenize(item["name"])):
+            postings.setdefault(token, []).append(item_index)
+
+    trigrams = {}
+    for token in postings:
+        for trigram in __get_trigrams(token):
+            trigrams.setdefault(trigram, []).append(token)
+
+    return {
+        "fingerprint": fingerprint,
+        "items": items,
+        "names": [__fold(item["name"]) for item in items],
+        "tokens": sorted(postings),
+        "postings": postings,
+        "trigrams": trigrams
+    }
+
+
+def __tokenize(text: str) -> [str]:
+    return __TOKEN_PATTERN.findall(__fold(text))
+
+
+def __get_trigrams(token: str) -> {str}:
+    padded_token = f"  {token} "
+    return {padded_token[position:position + 3] for position in range(len(padded_token) - 2)}
+
+
+def __load_index(name: str) -> {}:
+    try:
+        with open(__get_index_path(name), "r", encoding="utf-8") as index_file:
+            return json.load(index_file)
+    except (OSError, ValueError):
+        return None
+
+
+def __save_index(name: str, index: {}):
+    index_path = __get_index_path(name)
+    temporary_index_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        Path(index_path).parent.mkdir(parents=False, exist_ok=True)
+        with open(temporary_index_path, "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file)
+        os.replace(temporary_index_path, index_path)
+    except OSError as exception:
+        print(f"Unable to store the search index in the cache. Details: {exception}")
+
+
+def __get_index_path(name: str) -> str:
+    return config_loader.get_configuration_directory_path() + __INDEX_DIRECTORY_NAME + \
+        __INDEX_FILE_NAME.format(name=name)
@@ -0,0 +1,124 @@
+import sqlite3
+import time
+from contextlib import closing
+from datetime import date, timedelta
+from typing import Iterable, Iterator
+
+import config_loader
+from term import DayTerms
+
+DOCTOR = "doctor"
+CLINIC = "clinic"
+WEEKDAY = "weekday"
+HOUR = "hour"
+
+__DATABASE_FILE_NAME = "slot_history.db"
+__DEFAULT_RETENTION_DAYS = 365
+__SCHEMA = """
+    CREATE TABLE IF NOT EXISTS slots (
+        service_id INTEGER NOT NULL,
+        clinic_id INTEGER NOT NULL,
+        doctor_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        time TEXT NOT NULL,
+        first_seen INTEGER NOT NULL,
+        last_seen INTEGER NOT NULL,
+        PRIMARY KEY (service_id, clinic_id, doctor_id, date, time)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS slots_first_seen ON slots (service_id, first_seen);
+    CREATE INDEX IF NOT EXISTS slots_date ON slots (date);
+    CREATE TABLE IF NOT EXISTS doctors (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS clinics (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL
+    );
+"""
+__GROUP_COLUMNS = {
+    DOCTOR: ("slots.doctor_id", "COALESCE(doctors.name, slots.doctor_id)"),
+    CLINIC: ("slots.clinic_id", "COALESCE(clinics.name, slots.clinic_id)"),
+    WEEKDAY: ("slot_group", "strftime('%w', slots.first_seen, 'unixepoch', 'localtime')"),
+    HOUR: ("slot_group", "strftime('%H', slots.first_seen, 'unixepoch', 'localtime')")
+}
+__WEEKDAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def is_enabled() -> bool:
+    settings = config_loader.read_optional_configuration("history")
+    return settings.get("enabled", "true").lower() not in ("false", "no", "off", "0")
+
+
+def record(service_id: int, terms: Iterable[DayTerms], observed_at: float = None):
+    observed_at = int(observed_at or time.time())
+    slots, doctors, clinics = [], {}, {}
+
+    for day_terms in terms:
+        term_date = day_terms.date.isoformat()
+        for visit in day_terms.visits:
+            slots.append((service_id, visit.clinic.id, visit.doctor.id, term_date, visit.time.strftime("%H:%M"),
+                          observed_at, observed_at))
+            doctors[visit.doctor.id] = visit.doctor.name
+            clinics[visit.clinic.id] = visit.clinic.name
+
+    if not slots:
+        return
+
+    retention_days = int(config_loader.read_optional_configuration("history").get("retention_days",
+                                                                                    __DEFAULT_RETENTION_DAYS))
+    oldest_date = date.today() - timedelta(days=retention_days)
+
+    with closing(__connect()) as connection, connection:
+        connection.execute("DELETE FROM slots WHERE date < ?", (oldest_date.isoformat(),))
+        connection.executemany(
+            "INSERT INTO slots (service_id, clinic_id, doctor_id, date, time, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (service_id, clinic_id, doctor_id, date, time) "
+            "DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen)", slots)
+        connection.executemany("INSERT OR REPLACE INTO doctors (id, name) VALUES (?, ?)", doctors.items())
+        connection.executemany("INSERT OR REPLACE INTO clinics (id, name) VALUES (?, ?)", clinics.items())
+
+
+def get_statistics(group_by: str, service_id: int = None, clinic_id: int = None, doctor_id: int = None,
+                   days: int = None, limit: int = None) -> Iterator[{}]:
+    group_key, group_label = __GROUP_COLUMNS[group_by]
+    query = f"SELECT {group_label} AS slot_group, COUNT(*), " \
+            "COUNT(DISTINCT date(slots.first_seen, 'unixepoch', 'localtime')), " \
+            "AVG(julianday(slots.date) - julianday(slots.first_seen, 'unixepoch', 'localtime', 'start of day')), " \
+            "AVG(slots.last_seen - slots.first_seen) / 60.0 " \
+            "FROM slots LEFT JOIN doctors ON doctors.id = slots.doctor_id " \
+            "LEFT JOIN clinics ON clinics.id = slots.clinic_id"
+    conditions, parameters = [], []
+    for column, value in (("slots.service_id", service_id), ("slots.clinic_id", clinic_id),
+                          ("slots.doctor_id", doctor_id)):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            parameters.append(value)
+    if days is not None:
+        conditions.append("slots.first_seen >= ?")
+        parameters.append(int(time.time()) - days * 24 * 60 * 60)
+
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" GROUP BY {group_key} ORDER BY " + ("slot_group" if group_by in (WEEKDAY, HOUR) else "2 DESC")
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+
+    with closing(__connect()) as connection:
+        rows = connection.execute(query, parameters)
+        for slot_group, slots_count, days_count, lead_days, minutes_available in rows:
+            yield {
+                "group": __WEEKDAYS[int(slot_group)] if group_by == WEEKDAY else slot_group,
+                "slots": slots_count,
+                "days": days_count,
+                "lead_days": lead_days,
+                "minutes_available": minutes_available
+            }
+
+
+def __connect() -> sqlite3.Connection:
+    connection = sqlite3.connect(config_loader.get_configuration_directory_path() + __DATABASE_FILE_NAME, timeout=30)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.executescript(__SCHEMA)
+    return connection
@@ -0,0 +1,73 @@
+import hashlib
+import sqlite3
+from contextlib import closing
+from datetime import date
+from typing import Iterable
+
+import config_loader
+from luxmed_api import Language
+from term import DayTerms, Term
+
+__DATABASE_FILE_NAME = "slots.db"
+__SCHEMA = """
+    CREATE TABLE IF NOT EXISTS seen_slots (
+        monitor_key TEXT NOT NULL,
+        date TEXT NOT NULL,
+        time TEXT NOT NULL,
+        doctor_id INTEGER NOT NULL,
+        clinic_id INTEGER NOT NULL,
+        PRIMARY KEY (monitor_key, date, time, doctor_id, clinic_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS seen_slots_date ON seen_slots (date);
+"""
+
+
+def get_monitor_key(email_address: str, city_id: int, service_id: int, part_of_day: int, language: Language,
+                    clinic_id: int = None, doctor_id: int = None, account: str = None) -> str:
+    criteria = f"{email_address}|{city_id}|{service_id}|{part_of_day}|{language.value}|{clinic_id}|{doctor_id}"
+    if account is not None:
+        criteria += f"|{account}"
+    return hashlib.sha1(criteria.encode("utf-8")).hexdigest()
+
+
+def find_new_terms(monitor_key: str, terms: Iterable[DayTerms]) -> ([DayTerms], int):
+    terms = list(terms)
+    current_slots = {__get_slot_key(day_terms.date, visit) for day_terms in terms for visit in day_terms.visits}
+
+    with closing(__connect()) as connection, connection:
+        connection.execute("DELETE FROM seen_slots WHERE date < ?", (date.today().isoformat(),))
+        seen_slots = set(connection.execute(
+            "SELECT date, time, doctor_id, clinic_id FROM seen_slots WHERE monitor_key = ?", (monitor_key,)))
+
+        vanished_slots = [slot for slot in seen_slots if slot not in current_slots]
+        connection.executemany("DELETE FROM seen_slots WHERE monitor_key = ? AND date = ? AND time = ? "
+                               "AND doctor_id = ? AND clinic_id = ?",
+                               [(monitor_key, *slot) for slot in vanished_slots])
+
+    new_terms = []
+    for day_terms in terms:
+        new_visits = [visit for visit in day_terms.visits if __get_slot_key(day_terms.date, visit) not in seen_slots]
+        if new_visits:
+            new_terms.append(DayTerms(day_terms.date, new_visits))
+
+    return new_terms, len(vanished_slots)
+
+
+def mark_as_seen(monitor_key: str, terms: Iterable[DayTerms]):
+    slots = [(monitor_key, *__get_slot_key(day_terms.date, visit)) for day_terms in terms for visit in day_terms.visits]
+    if not slots:
+        return
+
+    with closing(__connect()) as connection, connection:
+        connection.executemany("INSERT OR IGNORE INTO seen_slots (monitor_key, date, time, doctor_id, clinic_id) "
+                               "VALUES (?, ?, ?, ?, ?)", slots)
+
+
+def __get_slot_key(term_date: date, visit: Term) -> (str, str, int, int):
+    return term_date.isoformat(), visit.time.strftime("%H:%M"), visit.doctor.id, visit.clinic.id
+
+
+def __connect() -> sqlite3.Connection:
+    connection = sqlite3.connect(config_loader.get_configuration_directory_path() + __DATABASE_FILE_NAME, timeout=30)
+    connection.executescript(__SCHEMA)
+    return connection
@@ -0,0 +1,72 @@
+from datetime import date, time
+
+
+class Doctor:
+    __slots__ = ("id", "name")
+
+    def __init__(self, doctor_id: int, name: str):
+        self.id = doctor_id
+        self.name = name
+
+
+class Clinic:
+    __slots__ = ("id", "name")
+
+    def __init__(self, clinic_id: int, name: str):
+        self.id = clinic_id
+        self.name = name
+
+
+class Term:
+    __slots__ = ("time", "doctor", "clinic", "part_of_day")
+
+    def __init__(self, term_time: time, doctor: Doctor, clinic: Clinic, part_of_day: int):
+        self.time = term_time
+        self.doctor = doctor
+        self.clinic = clinic
+        self.part_of_day = part_of_day
+
+    @property
+    def key(self) -> (time, int, int):
+        return self.time, self.doctor.id, self.clinic.id
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Term) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"Term({self.time}, {self.doctor.name}, {self.clinic.name})"
+
+
+class DayTerms:
+    __slots__ = ("date", "visits")
+
+    def __init__(self, terms_date: date, visits: [Term]):
+        self.date = terms_date
+        self.visits = visits
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, DayTerms) and self.date == other.date and self.visits == other.visits
+
+    def __repr__(self) -> str:
+        return f"DayTerms({self.date}, {len(self.visits)} visit(s))"
+
+
+__doctors = {}
+__clinics = {}
+
+
+def get_doctor(doctor_id: int, name: str) -> Doctor:
+    doctor = __doctors.get(doctor_id)
+    if doctor is None or doctor.name != name:
+        doctor = __doctors[doctor_id] = Doctor(doctor_id, name)
+    return doctor
+
+
+def get_clinic(clinic_id: int, name: str) -> Clinic:
+    clinic = __clinics.get(clinic_id)
+    if clinic is None or clinic.name != name:
+        clinic = __clinics[clinic_id] = Clinic(clinic_id, name)
+    return clinic
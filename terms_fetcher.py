@@ -0,0 +1,117 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Iterator
+
+import config_loader
+import luxmed_api
+import utils
+from luxmed_api import Language
+
+__DEFAULT_SHARD_DAYS = 14
+__DEFAULT_WORKERS = 4
+__DEFAULT_REFRESH_MINUTES = 15
+__DEFAULT_MAX_SHARDS = 6
+
+__shard_cache = {}
+__shard_cache_lock = threading.Lock()
+__executor = None
+__executor_lock = threading.Lock()
+
+
+def fetch_terms(city_id: int, service_id: int, from_date: date, to_date: date, language: Language,
+                clinic_id: int = None, doctor_id: int = None, account: str = None) -> Iterator[{}]:
+    shard_days, workers, refresh_minutes, max_shards = __load_sharding_settings()
+
+    if (to_date - from_date).days < shard_days:
+        return iter(luxmed_api.get_terms(city_id, service_id, from_date, to_date, language, clinic_id, doctor_id,
+                                         account))
+
+    shards = __split_into_shards(from_date, to_date, shard_days, max_shards)
+    executor = __get_executor(workers)
+    futures = []
+    for index, (shard_from_date, shard_to_date) in enumerate(shards):
+        shard_key = (account, city_id, service_id, language, clinic_id, doctor_id, shard_from_date, shard_to_date)
+        max_age = index * refresh_minutes * 60
+        futures.append(executor.submit(__fetch_shard, shard_key, max_age))
+
+    return __merge_shards(shards, futures)
+
+
+def shutdown():
+    global __executor
+
+    with __executor_lock:
+        if __executor is not None:
+            __executor.shutdown(wait=False, cancel_futures=True)
+            __executor = None
+
+
+def __fetch_shard(shard_key: tuple, max_age: float) -> [{}]:
+    with __shard_cache_lock:
+        cached_shard = __shard_cache.get(shard_key)
+    if cached_shard is not None and time.monotonic() - cached_shard[0] < max_age:
+        return cached_shard[1]
+
+    account, city_id, service_id, language, clinic_id, doctor_id, shard_from_date, shard_to_date = shard_key
+    terms = luxmed_api.get_terms(city_id, service_id, shard_from_date, shard_to_date, language, clinic_id, doctor_id,
+                                 account)
+
+    with __shard_cache_lock:
+        __shard_cache[shard_key] = (time.monotonic(), terms)
+        __remove_expired_shards(date.today())
+    return terms
+
+
+def __remove_expired_shards(today: date):
+    for expired_shard_key in [shard_key for shard_key in __shard_cache if shard_key[-1] < today]:
+        del __shard_cache[expired_shard_key]
+
+
+def __split_into_shards(from_date: date, to_date: date, shard_days: int, max_shards: int) -> [(date, date)]:
+    shards = []
+    shard_from_date = from_date
+    while shard_from_date <= to_date:
+        if len(shards) == max_shards - 1:
+            shards.append((shard_from_date, to_date))
+            break
+        grid_end = shard_days - 1 - shard_from_date.toordinal() % shard_days
+        shard_to_date = min(shard_from_date + timedelta(days=grid_end), to_date)
+        shards.append((shard_from_date, shard_to_date))
+        shard_from_date = shard_to_date + timedelta(days=1)
+    return shards
+
+
+def __merge_shards(shards: [(date, date)], futures: [Future]) -> Iterator[{}]:
+    try:
+        for (shard_from_date, shard_to_date), future in zip(shards, futures):
+            for terms_in_day in future.result():
+                day = utils.convert_string_to_date(terms_in_day["day"])
+                if shard_from_date <= day <= shard_to_date:
+                    yield {"day": terms_in_day["day"], "terms": __deduplicate_terms(terms_in_day["terms"])}
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def __deduplicate_terms(terms: [{}]) -> [{}]:
+    unique_terms = {(term["dateTimeFrom"], term["doctor"]["id"], term["clinicId"]): term for term in terms}
+    return terms if len(unique_terms) == len(terms) else list(unique_terms.values())
+
+
+def __get_executor(workers: int) -> ThreadPoolExecutor:
+    global __executor
+
+    with __executor_lock:
+        if __executor is None:
+            __executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="terms-shard")
+        return __executor
+
+
+def __load_sharding_settings() -> (int, int, float, int):
+    settings = config_loader.read_optional_configuration("sharding")
+    return (max(1, int(settings.get("days", __DEFAULT_SHARD_DAYS))),
+            max(1, int(settings.get("workers", __DEFAULT_WORKERS))),
+            float(settings.get("refresh_minutes", __DEFAULT_REFRESH_MINUTES)),
+            max(1, int(settings.get("max_shards", __DEFAULT_MAX_SHARDS))))
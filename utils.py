@@ -1,12 +1,21 @@
-from datetime import datetime
+from datetime import datetime, date, time
+from functools import lru_cache
 
+__TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+__TIMESTAMP_LENGTH = len("2020-11-30T12:00:00")
 
-def convert_string_to_time(date: str) -> datetime.time:
-    return datetime.strptime(date, "%Y-%m-%dT%H:%M:%S").time()
 
+def convert_string_to_time(date: str) -> time:
+    if __has_expected_timestamp_format(date):
+        return __convert_string_to_time_of_day(date[11:])
+    return datetime.strptime(date, __TIMESTAMP_FORMAT).time()
 
-def convert_string_to_date(date: str) -> datetime.date:
-    return datetime.strptime(date, "%Y-%m-%dT%H:%M:%S").date()
+
+@lru_cache(maxsize=1024)
+def convert_string_to_date(date: str) -> date:
+    if __has_expected_timestamp_format(date):
+        return __convert_string_to_calendar_date(date[:10])
+    return datetime.strptime(date, __TIMESTAMP_FORMAT).date()
 
 
 def make_date_human_ready(date: datetime.date) -> str:
@@ -15,3 +24,23 @@ def make_date_human_ready(date: datetime.date) -> str:
 
 def make_time_human_ready(date: datetime.date) -> str:
     return date.strftime("%H:%M")
+
+
+def __has_expected_timestamp_format(date: str) -> bool:
+    return len(date) == __TIMESTAMP_LENGTH and date[10] == "T" and date.isascii()
+
+
+@lru_cache(maxsize=2048)
+def __convert_string_to_time_of_day(time_of_day: str) -> time:
+    try:
+        return time.fromisoformat(time_of_day)
+    except ValueError:
+        return datetime.strptime(time_of_day, "%H:%M:%S").time()
+
+
+@lru_cache(maxsize=1024)
+def __convert_string_to_calendar_date(calendar_date: str) -> date:
+    try:
+        return date.fromisoformat(calendar_date)
+    except ValueError:
+        return datetime.strptime(calendar_date, "%Y-%m-%d").date()
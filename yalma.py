@@ -1,50 +1,93 @@
+import sys
 from datetime import date
 
 import click
-from tabulate import tabulate
 
-import booking_service
 import config_loader
-import report_service
-from luxmed_api import Language
+
+__TABLE_OUTPUT = "table"
+__NOTIFICATION_OUTPUT = "notification"
+__MACHINE_READABLE_OUTPUTS = ["json", "ndjson"]
+
+
+def __output_option(default_output: str, help_text: str):
+    return click.option("-o", "--output", type=click.Choice([default_output, *__MACHINE_READABLE_OUTPUTS],
+                                                            case_sensitive=False),
+                        default=default_output, show_default=True, help=help_text)
 
 
 @click.group()
-def main():
+@click.option("--stats", is_flag=True,
+              help="print timings of particular phases and other statistics as JSON when the command ends")
+@click.pass_context
+def main(context, stats):
     config_loader.initialize_app_configuration()
 
+    if stats:
+        context.call_on_close(__print_stats)
+
 
 @main.command(help="get a list of available cities")
-def cities():
-    retrieved_cities = booking_service.get_cities()
-    __display_results(retrieved_cities, ["city ID", "city name"])
+@click.option("-r", "--refresh", is_flag=True, help="download the data again instead of using the cached one")
+@__output_option(__TABLE_OUTPUT, "print results as a table, a JSON array or JSON lines")
+def cities(refresh, output):
+    import booking_service
+
+    with __progress_output(output):
+        retrieved_cities = booking_service.get_cities(refresh)
+    __display_results(retrieved_cities, ["city ID", "city name"], output)
 
 
 @main.command(help="get a list of available clinics")
 @click.option("-c", "--city-id", type=int, required=True, help="return a list of clinics for the given city ID")
 @click.option("-s", "--service-id", type=int, required=True, help="a service that doctors should be specialized in")
-def clinics(city_id, service_id):
-    retrieved_clinics = booking_service.get_clinics(city_id, service_id)
-    __display_results(retrieved_clinics, ["clinic ID", "clinic name"])
+@click.option("-r", "--refresh", is_flag=True, help="download the data again instead of using the cached one")
+@click.option("-q", "--query", type=str, help="show only clinics matching the given text, the best matches first")
+@__output_option(__TABLE_OUTPUT, "print results as a table, a JSON array or JSON lines")
+def clinics(city_id, service_id, refresh, query, output):
+    import booking_service
+
+    with __progress_output(output):
+        retrieved_clinics = booking_service.get_clinics(city_id, service_id, refresh)
+        if query is not None:
+            retrieved_clinics = __search(f"clinics_{city_id}_{service_id}", retrieved_clinics, query)
+    __display_results(retrieved_clinics, ["clinic ID", "clinic name"], output)
 
 
 @main.command(help="get a list of available doctors")
 @click.option("-c", "--city-id", type=int, required=True, help="a city where doctors should be located")
 @click.option("-s", "--service-id", type=int, required=True, help="a service that doctors should be specialized in")
 @click.option("-cl", "--clinic-id", type=int, help="a clinic where you are looking for doctors")
-def doctors(city_id, service_id, clinic_id):
-    retrieved_doctors = booking_service.get_doctors(city_id, service_id, clinic_id)
-    __display_results(retrieved_doctors, ["doctor ID", "doctor name"])
+@click.option("-r", "--refresh", is_flag=True, help="download the data again instead of using the cached one")
+@click.option("-q", "--query", type=str, help="show only doctors matching the given text, the best matches first")
+@__output_option(__TABLE_OUTPUT, "print results as a table, a JSON array or JSON lines")
+def doctors(city_id, service_id, clinic_id, refresh, query, output):
+    import booking_service
+
+    with __progress_output(output):
+        retrieved_doctors = booking_service.get_doctors(city_id, service_id, clinic_id, refresh)
+        if query is not None:
+            retrieved_doctors = __search(f"doctors_{city_id}_{service_id}_{clinic_id}", retrieved_doctors, query)
+    __display_results(retrieved_doctors, ["doctor ID", "doctor name"], output)
 
 
 @main.command(help="get a list of available services")
-def services():
-    retrieved_services = booking_service.get_services()
-    __display_results(retrieved_services, ["service ID", "service name"])
+@click.option("-r", "--refresh", is_flag=True, help="download the data again instead of using the cached one")
+@click.option("-q", "--query", type=str, help="show only services matching the given text, the best matches first")
+@__output_option(__TABLE_OUTPUT, "print results as a table, a JSON array or JSON lines")
+def services(refresh, query, output):
+    import booking_service
+
+    with __progress_output(output):
+        retrieved_services = booking_service.get_services(refresh)
+        if query is not None:
+            retrieved_services = __search("services", retrieved_services, query)
+    __display_results(retrieved_services, ["service ID", "service name"], output)
 
 
 @main.command(help="monitor the availability of visits for the given criteria")
-@click.option("-e", "--email", type=str, required=True, help="send monitoring report to the given email address")
+@click.option("-e", "--email", type=str,
+              help="send monitoring report to the given email address. Required unless visits are printed as JSON")
 @click.option("-c", "--city-id", type=int, required=True, help="monitor visits in the given city")
 @click.option("-s", "--service-id", type=int, required=True, help="monitor visits for the given service")
 @click.option("-f", "--from-date", type=click.DateTime(formats=["%Y-%m-%d"]), default=str(date.today()),
@@ -65,26 +108,204 @@ def services():
               show_default=True, help="the language in which the doctor communicates with a patient")
 @click.option("-d", "--doctor-id", type=int, help="monitor visits for the given doctor")
 @click.option("-cl", "--clinic-id", type=int, help="monitor visits in the given clinic")
-def monitor(email, city_id, service_id, from_date, to_date, time_of_day, language, clinic_id=None, doctor_id=None):
+@click.option("-a", "--notify-all", is_flag=True,
+              help="notify about all available visits, not only about those which have appeared since the last check")
+@click.option("-ac", "--account", type=str,
+              help="use the Luxmed account defined in the [luxmed:<account>] section of the config file")
+@__output_option(__NOTIFICATION_OUTPUT,
+                 "send a notification, or print all matching visits as a JSON array or JSON lines instead. "
+                 "JSON lines are printed as soon as visits of a particular day are parsed")
+def monitor(email, city_id, service_id, from_date, to_date, time_of_day, language, notify_all, account, output,
+            clinic_id=None, doctor_id=None):
+    import booking_service
+    import json_output
+    import monitor_loader
+    import notifier
+    import report_service
+    import slot_index
+
+    if email is None and output not in __MACHINE_READABLE_OUTPUTS:
+        raise click.UsageError("Missing option '-e' / '--email'.")
+
     parsed_from_date = from_date.date()
     parsed_to_date = to_date.date()
-    parsed_language = __resolve_language(language)
-    available_terms = booking_service.get_available_terms(city_id, service_id, parsed_from_date, parsed_to_date,
-                                                          time_of_day, parsed_language, clinic_id, doctor_id)
-    report_service.make_report(available_terms, email)
+    parsed_language = monitor_loader.resolve_language(language)
+    results_stream = sys.stdout
 
+    with __progress_output(output):
+        available_terms = booking_service.iterate_available_terms(city_id, service_id, parsed_from_date,
+                                                                  parsed_to_date, time_of_day, parsed_language,
+                                                                  clinic_id, doctor_id, account)
+        if output in __MACHINE_READABLE_OUTPUTS:
+            json_output.write_terms(available_terms, output, results_stream)
+            return
 
-def __display_results(results: {}, headers: [str]):
-    if results:
-        parsed_results = [(item["id"], item["name"]) for item in results]
-        table_view = tabulate(parsed_results, headers=headers, tablefmt="psql")
-        print(table_view)
+        monitor_key = None if notify_all else slot_index.get_monitor_key(email, city_id, service_id, time_of_day,
+                                                                         parsed_language, clinic_id, doctor_id,
+                                                                         account)
+        try:
+            with notifier.background_dispatch():
+                report_service.make_report(available_terms, email, monitor_key)
+        except notifier.NotifierException as exception:
+            raise click.ClickException(str(exception))
+
+
+@main.command(help="run monitors defined in a JSON file periodically within a single long-running process")
+@click.option("-m", "--monitors", "monitors_file", type=click.Path(exists=True, dir_okay=False),
+              default=config_loader.get_default_monitors_file_path,
+              show_default="monitors.json in the config directory",
+              help="a JSON file with a list of monitor definitions")
+@click.option("-a", "--adaptive", is_flag=True,
+              help="adjust intervals of monitors to the hours in which new visits usually appear")
+@click.option("-b", "--budget", type=click.FloatRange(1, None), default=120, show_default=True,
+              help="the maximum number of checks per hour of all monitors together in the adaptive mode")
+@click.option("-p", "--metrics-port", type=click.IntRange(1, 65535),
+              help="expose metrics in the Prometheus format at http://<host>:<port>/metrics")
+@click.option("-H", "--metrics-host", type=str, default="127.0.0.1", show_default=True,
+              help="the address on which metrics are exposed, e.g. 0.0.0.0 to expose them on all interfaces")
+@__output_option(__NOTIFICATION_OUTPUT,
+                 "deliver notifications through the configured sinks, or print them instead: json - one notification "
+                 "per line, ndjson - one visit per line")
+def daemon(monitors_file, adaptive, budget, metrics_port, metrics_host, output):
+    import adaptive_polling
+    import metrics
+    import notifier
+    import scheduler
+
+    monitors = __read_monitors(monitors_file)
+    if metrics_port is not None:
+        metrics.start_http_server(metrics_port, metrics_host)
+
+    connection = adaptive_polling.connect() if adaptive else None
+    polling_policy = adaptive_polling.AdaptivePollingPolicy(connection, monitors, budget) if adaptive else None
+    sinks = __create_output_sinks(output)
+
+    with __progress_output(output):
+        try:
+            scheduler.run(monitors, polling_policy, sinks)
+        except KeyboardInterrupt:
+            print("The daemon has been stopped")
+        except notifier.NotifierException as exception:
+            raise click.ClickException(str(exception))
+        finally:
+            if connection is not None:
+                connection.close()
+
+
+@main.command(help="check all monitors defined in a JSON file at once using concurrent requests")
+@click.option("-m", "--monitors", "monitors_file", type=click.Path(exists=True, dir_okay=False),
+              default=config_loader.get_default_monitors_file_path,
+              show_default="monitors.json in the config directory",
+              help="a JSON file with a list of monitor definitions")
+@click.option("-w", "--workers", type=click.IntRange(1, 64), default=4, show_default=True,
+              help="the maximum number of requests sent to the Luxmed API at the same time")
+@click.option("-r", "--rate", type=click.FloatRange(0.1, None),
+              help="the maximum number of requests per second sent to the Luxmed API by every account. If not "
+                   "provided, the requests_per_second setting of the account from the config file is used")
+@__output_option(__NOTIFICATION_OUTPUT,
+                 "deliver notifications through the configured sinks, or print them instead: json - one notification "
+                 "per line, ndjson - one visit per line")
+def batch(monitors_file, workers, rate, output):
+    import batch_service
+    import notifier
+
+    monitors = __read_monitors(monitors_file)
+    sinks = __create_output_sinks(output)
+
+    with __progress_output(output):
+        try:
+            batch_service.run(monitors, workers, rate, sinks)
+        except notifier.NotifierException as exception:
+            raise click.ClickException(str(exception))
+
+
+@main.command(help="show statistics of visits observed so far, e.g. how often a doctor releases new visits")
+@click.option("-g", "--group-by", type=click.Choice(["doctor", "clinic", "weekday", "hour"], case_sensitive=False),
+              default="doctor", show_default=True,
+              help="group visits by the doctor, the clinic, or the day of the week or the hour in which they appeared")
+@click.option("-s", "--service-id", type=int, help="consider only visits for the given service")
+@click.option("-cl", "--clinic-id", type=int, help="consider only visits in the given clinic")
+@click.option("-d", "--doctor-id", type=int, help="consider only visits of the given doctor")
+@click.option("-D", "--days", type=click.IntRange(1, None),
+              help="consider only visits which have appeared within the given number of days")
+@click.option("-n", "--limit", type=click.IntRange(1, None), default=20, show_default=True,
+              help="the maximum number of rows")
+@__output_option(__TABLE_OUTPUT, "print results as a table, a JSON array or JSON lines")
+def history(group_by, service_id, clinic_id, doctor_id, days, limit, output):
+    import slot_history
+
+    statistics = slot_history.get_statistics(group_by.lower(), service_id, clinic_id, doctor_id, days, limit)
+    if output in __MACHINE_READABLE_OUTPUTS:
+        __write_json(statistics, output)
+        return
+
+    rows = [(item["group"], item["slots"], item["days"], round(item["lead_days"], 1),
+             round(item["minutes_available"])) for item in statistics]
+    __display_table(rows, [group_by.lower(), "visits", "days with new visits", "avg days in advance",
+                           "avg minutes available"])
+
+
+def __read_monitors(monitors_file: str) -> [{}]:
+    import monitor_loader
+
+    try:
+        return monitor_loader.read_monitors(monitors_file)
+    except monitor_loader.MonitorDefinitionException as exception:
+        raise click.ClickException(str(exception))
+
+
+def __search(index_name: str, results: [{}], query: str) -> [{}]:
+    import metrics
+    import search_index
+
+    with metrics.timed("search"):
+        return search_index.search(index_name, results, query)
+
+
+def __print_stats():
+    import json
+    import metrics
+
+    print(json.dumps(metrics.get_summary(), indent=2), file=sys.stderr)
+
+
+def __create_output_sinks(output: str) -> []:
+    import notifier
+
+    if output not in __MACHINE_READABLE_OUTPUTS:
+        return None
+    return [notifier.create_output_sink(visits_per_line=output == "ndjson")]
+
+
+def __progress_output(output: str):
+    import contextlib
+
+    if output in __MACHINE_READABLE_OUTPUTS:
+        return contextlib.redirect_stdout(sys.stderr)
+    return contextlib.nullcontext()
+
+
+def __display_results(results: {}, headers: [str], output: str = __TABLE_OUTPUT):
+    if output in __MACHINE_READABLE_OUTPUTS:
+        __write_json(({"id": item["id"], "name": item["name"]} for item in results), output)
     else:
-        print("No results have found for given criteria")
+        __display_table([(item["id"], item["name"]) for item in results], headers)
+
 
+def __write_json(items, output: str):
+    import json_output
 
-def __resolve_language(language: str) -> Language:
-    return Language.POLISH if language == "pl" else Language.ENGLISH
+    json_output.write_items(items, output)
+
+
+def __display_table(rows: [tuple], headers: [str]):
+    from tabulate import tabulate
+
+    if rows:
+        table_view = tabulate(rows, headers=headers, tablefmt="psql")
+        print(table_view)
+    else:
+        print("No results have found for given criteria")
 
 
 if __name__ == "__main__":